@@ -6,7 +6,7 @@ from sqlalchemy import pool
 from alembic import context
 from sqlalchemy.ext.asyncio import AsyncEngine
 from asyncio import get_event_loop
-from app.models import Base, Subscription, Plan, Invoice, User
+from app.models import Base, Subscription, Plan, Invoice, User, BillingRun
 from app.core import config as app_config
 
 # this is the Alembic Config object, which provides
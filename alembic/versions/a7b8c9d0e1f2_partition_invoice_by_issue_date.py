@@ -0,0 +1,176 @@
+"""Range-partition invoice by issue_date, one partition per month
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2026-10-18 17:48:09.116352
+
+"""
+from datetime import date
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7b8c9d0e1f2'
+down_revision: Union[str, None] = 'f6a7b8c9d0e1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Months of partitions created past the current one; the
+# maintain_invoice_partitions beat task keeps this window rolling.
+MONTHS_AHEAD = 3
+
+COLUMNS = 'id, user_id, subscription_id, amount, issue_date, due_date, status'
+
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+# Row triggers on a partitioned table fire with the partition as
+# TG_TABLE_NAME; the invoice trigger passes the parent's name instead.
+NOTIFY_FUNCTION = """
+CREATE OR REPLACE FUNCTION notify_billing_change() RETURNS trigger AS $$
+DECLARE
+    row_data record;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_data := OLD;
+    ELSE
+        row_data := NEW;
+    END IF;
+    PERFORM pg_notify(
+        'billing_events',
+        json_build_object(
+            'table', coalesce(TG_ARGV[0], TG_TABLE_NAME),
+            'op', lower(TG_OP),
+            'id', row_data.id,
+            'user_id', to_jsonb(row_data) -> 'user_id'
+        )::text
+    );
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+
+def _create_invoice_indexes() -> None:
+    op.create_index(op.f('ix_invoice_id'), 'invoice', ['id'], unique=False)
+    op.create_index(
+        'ix_invoice_unpaid_subscription_id',
+        'invoice',
+        ['subscription_id'],
+        postgresql_where=sa.text("status = 'unpaid'"),
+    )
+    op.execute("""
+    CREATE TRIGGER invoice_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON invoice
+    FOR EACH ROW EXECUTE FUNCTION notify_billing_change('invoice')
+    """)
+
+
+def _rename_legacy() -> None:
+    # Index-backed names are schema-wide; free them for the new table.
+    # The trigger goes too so copying rows does not notify per row.
+    op.execute('DROP TRIGGER IF EXISTS invoice_notify_change ON invoice')
+    op.rename_table('invoice', 'invoice_legacy')
+    op.execute('ALTER INDEX invoice_pkey RENAME TO invoice_legacy_pkey')
+    op.execute(
+        'ALTER INDEX uq_invoice_subscription_issue_date '
+        'RENAME TO uq_invoice_legacy_subscription_issue_date'
+    )
+    op.execute('ALTER INDEX ix_invoice_id RENAME TO ix_invoice_legacy_id')
+    op.execute(
+        'ALTER INDEX ix_invoice_unpaid_subscription_id '
+        'RENAME TO ix_invoice_legacy_unpaid_subscription_id'
+    )
+
+
+def upgrade() -> None:
+    # Runs in one transaction: the table is unavailable for writes while
+    # the rows are copied, so schedule it with the billing beat paused.
+    _rename_legacy()
+    op.execute(NOTIFY_FUNCTION)
+
+    op.execute("""
+    CREATE TABLE invoice (
+        id INTEGER NOT NULL DEFAULT nextval('invoice_id_seq'),
+        user_id INTEGER NOT NULL REFERENCES "user" (id),
+        subscription_id INTEGER REFERENCES subscription (id),
+        amount NUMERIC,
+        issue_date DATE NOT NULL,
+        due_date DATE,
+        status VARCHAR,
+        CONSTRAINT invoice_pkey PRIMARY KEY (id, issue_date),
+        CONSTRAINT uq_invoice_subscription_issue_date
+            UNIQUE (subscription_id, issue_date)
+    ) PARTITION BY RANGE (issue_date)
+    """)
+    op.execute('ALTER SEQUENCE invoice_id_seq OWNED BY invoice.id')
+
+    bind = op.get_bind()
+    # issue_date becomes part of the primary key; legacy rows without
+    # one are filed under their due date, or today.
+    issue_date = 'COALESCE(issue_date, due_date, CURRENT_DATE)'
+    first = bind.execute(
+        sa.text(f'SELECT min({issue_date}) FROM invoice_legacy')
+    ).scalar()
+    current = date.today().replace(day=1)
+    month = (first or current).replace(day=1)
+    while month <= _add_months(current, MONTHS_AHEAD):
+        op.execute(
+            f"CREATE TABLE invoice_p{month:%Y%m} PARTITION OF invoice "
+            f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}')"
+        )
+        month = _add_months(month, 1)
+
+    op.execute(f"""
+    INSERT INTO invoice ({COLUMNS})
+    SELECT id, user_id, subscription_id, amount, {issue_date}, due_date, status
+    FROM invoice_legacy
+    """)
+    op.drop_table('invoice_legacy')
+
+    _create_invoice_indexes()
+    op.execute('ANALYZE invoice')
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS invoice_notify_change ON invoice')
+    op.rename_table('invoice', 'invoice_partitioned')
+    op.execute('ALTER INDEX invoice_pkey RENAME TO invoice_partitioned_pkey')
+    op.execute(
+        'ALTER INDEX uq_invoice_subscription_issue_date '
+        'RENAME TO uq_invoice_partitioned_subscription_issue_date'
+    )
+    op.execute('ALTER INDEX ix_invoice_id RENAME TO ix_invoice_partitioned_id')
+    op.execute(
+        'ALTER INDEX ix_invoice_unpaid_subscription_id '
+        'RENAME TO ix_invoice_partitioned_unpaid_subscription_id'
+    )
+
+    op.create_table('invoice',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('subscription_id', sa.Integer(), nullable=True),
+    sa.Column('amount', sa.Numeric(), nullable=True),
+    sa.Column('issue_date', sa.Date(), nullable=True),
+    sa.Column('due_date', sa.Date(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('id', sa.Integer(), server_default=sa.text("nextval('invoice_id_seq')"), nullable=False),
+    sa.ForeignKeyConstraint(['subscription_id'], ['subscription.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('subscription_id', 'issue_date', name='uq_invoice_subscription_issue_date')
+    )
+    op.execute('ALTER SEQUENCE invoice_id_seq OWNED BY invoice.id')
+    op.execute(f"""
+    INSERT INTO invoice ({COLUMNS})
+    SELECT {COLUMNS} FROM invoice_partitioned
+    """)
+    # Archived partitions in invoice_archive are left in place.
+    op.drop_table('invoice_partitioned')
+
+    _create_invoice_indexes()
@@ -0,0 +1,62 @@
+"""Billing run ledger and unique invoice per subscription per day
+
+Revision ID: b3f1c2d4e5a6
+Revises: 6407df3bb50a
+Create Date: 2026-10-18 10:12:41.118203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f1c2d4e5a6'
+down_revision: Union[str, None] = '6407df3bb50a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('billing_run',
+    sa.Column('billing_date', sa.Date(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('shards', sa.Integer(), nullable=False),
+    sa.Column('invoices', sa.Integer(), nullable=False),
+    sa.Column('started_on', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('finished_on', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_billing_run_id'), 'billing_run', ['id'], unique=False)
+    # Earlier overlapping billing runs left duplicate invoices behind;
+    # keep the first of each (subscription_id, issue_date) pair.
+    op.execute("""
+    DELETE FROM invoice duplicate
+    USING invoice original
+    WHERE duplicate.subscription_id = original.subscription_id
+      AND duplicate.issue_date = original.issue_date
+      AND duplicate.id > original.id
+    """)
+
+    # Build the index without blocking writes, then promote it to the
+    # constraint, which only takes a brief lock.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_invoice_subscription_issue_date',
+            'invoice',
+            ['subscription_id', 'issue_date'],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+    op.execute(
+        'ALTER TABLE invoice ADD CONSTRAINT uq_invoice_subscription_issue_date '
+        'UNIQUE USING INDEX uq_invoice_subscription_issue_date'
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_invoice_subscription_issue_date', 'invoice', type_='unique')
+    op.drop_index(op.f('ix_billing_run_id'), table_name='billing_run')
+    op.drop_table('billing_run')
@@ -0,0 +1,30 @@
+"""Change notification trigger on user
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2026-10-19 09:14:52.208731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8c9d0e1f2a3'
+down_revision: Union[str, None] = 'a7b8c9d0e1f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lets every API process drop its cached principal for a changed user.
+    op.execute("""
+    CREATE TRIGGER user_notify_change
+    AFTER INSERT OR UPDATE OR DELETE ON "user"
+    FOR EACH ROW EXECUTE FUNCTION notify_billing_change()
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS user_notify_change ON "user"')
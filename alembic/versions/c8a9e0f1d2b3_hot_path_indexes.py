@@ -0,0 +1,63 @@
+"""Indexes for the hot subscription and invoice lookups
+
+Revision ID: c8a9e0f1d2b3
+Revises: b3f1c2d4e5a6
+Create Date: 2026-10-18 11:02:17.540911
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8a9e0f1d2b3'
+down_revision: Union[str, None] = 'b3f1c2d4e5a6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction; build the indexes
+    # without blocking writes on the live tables.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_subscription_user_id_status',
+            'subscription',
+            ['user_id', 'status'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_subscription_active_end_date',
+            'subscription',
+            [sa.text('date(end_date)')],
+            postgresql_where=sa.text("status = 'active'"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_invoice_unpaid_subscription_id',
+            'invoice',
+            ['subscription_id'],
+            postgresql_where=sa.text("status = 'unpaid'"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_invoice_unpaid_subscription_id',
+            table_name='invoice',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_subscription_active_end_date',
+            table_name='subscription',
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_subscription_user_id_status',
+            table_name='subscription',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,29 @@
+"""Record the payment date on invoice
+
+Revision ID: c9d0e1f2a3b4
+Revises: b8c9d0e1f2a3
+Create Date: 2026-10-19 11:02:37.415260
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c9d0e1f2a3b4'
+down_revision: Union[str, None] = 'b8c9d0e1f2a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Payments used to overwrite issue_date, which is the partition key.
+    # A nullable column without a default is a catalog-only change and
+    # cascades to every partition.
+    op.add_column('invoice', sa.Column('paid_on', sa.Date(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('invoice', 'paid_on')
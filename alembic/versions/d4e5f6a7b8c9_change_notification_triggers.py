@@ -0,0 +1,58 @@
+"""Change notification triggers on subscription, invoice and plan
+
+Revision ID: d4e5f6a7b8c9
+Revises: c8a9e0f1d2b3
+Create Date: 2026-10-18 13:40:05.271846
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd4e5f6a7b8c9'
+down_revision: Union[str, None] = 'c8a9e0f1d2b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ['subscription', 'invoice', 'plan']
+
+
+def upgrade() -> None:
+    # to_jsonb(...) -> 'user_id' is NULL for tables without the column.
+    op.execute("""
+    CREATE OR REPLACE FUNCTION notify_billing_change() RETURNS trigger AS $$
+    DECLARE
+        row_data record;
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            row_data := OLD;
+        ELSE
+            row_data := NEW;
+        END IF;
+        PERFORM pg_notify(
+            'billing_events',
+            json_build_object(
+                'table', TG_TABLE_NAME,
+                'op', lower(TG_OP),
+                'id', row_data.id,
+                'user_id', to_jsonb(row_data) -> 'user_id'
+            )::text
+        );
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql
+    """)
+    for table in TABLES:
+        op.execute(f"""
+        CREATE TRIGGER {table}_notify_change
+        AFTER INSERT OR UPDATE OR DELETE ON "{table}"
+        FOR EACH ROW EXECUTE FUNCTION notify_billing_change()
+        """)
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.execute(f'DROP TRIGGER IF EXISTS {table}_notify_change ON "{table}"')
+    op.execute("DROP FUNCTION IF EXISTS notify_billing_change()")
@@ -0,0 +1,37 @@
+"""Renewal queue fallback table
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2026-10-18 15:02:17.530914
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5f6a7b8c9d0'
+down_revision: Union[str, None] = 'd4e5f6a7b8c9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('renewal_queue',
+    sa.Column('subscription_id', sa.Integer(), nullable=False),
+    sa.Column('due_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.ForeignKeyConstraint(['subscription_id'], ['subscription.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('subscription_id')
+    )
+    op.create_index(op.f('ix_renewal_queue_due_at'), 'renewal_queue', ['due_at'], unique=False)
+    op.create_index(op.f('ix_renewal_queue_id'), 'renewal_queue', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_renewal_queue_id'), table_name='renewal_queue')
+    op.drop_index(op.f('ix_renewal_queue_due_at'), table_name='renewal_queue')
+    op.drop_table('renewal_queue')
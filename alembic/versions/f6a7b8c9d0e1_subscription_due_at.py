@@ -0,0 +1,75 @@
+"""Stored, indexed subscription due_at
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2026-10-18 16:21:44.902317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f6a7b8c9d0e1'
+down_revision: Union[str, None] = 'e5f6a7b8c9d0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    # A nullable column without a default is a catalog-only change.
+    op.add_column(
+        'subscription', sa.Column('due_at', sa.DateTime(timezone=True), nullable=True)
+    )
+
+    # end_date holds naive UTC. Backfill in id ranges, committing each
+    # one, so no transaction holds more than a batch of row locks.
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        max_id = bind.execute(sa.text('SELECT max(id) FROM subscription')).scalar()
+        for start in range(0, (max_id or 0) + 1, BACKFILL_BATCH_SIZE):
+            bind.execute(
+                sa.text(
+                    """
+                    UPDATE subscription
+                    SET due_at = end_date AT TIME ZONE 'UTC'
+                    WHERE id > :start AND id <= :end
+                      AND due_at IS NULL AND end_date IS NOT NULL
+                    """
+                ),
+                {'start': start, 'end': start + BACKFILL_BATCH_SIZE},
+            )
+
+        op.create_index(
+            'ix_subscription_active_due_at',
+            'subscription',
+            ['due_at'],
+            postgresql_where=sa.text("status = 'active'"),
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_subscription_active_end_date',
+            table_name='subscription',
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_subscription_active_end_date',
+            'subscription',
+            [sa.text('date(end_date)')],
+            postgresql_where=sa.text("status = 'active'"),
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_subscription_active_due_at',
+            table_name='subscription',
+            postgresql_concurrently=True,
+        )
+    op.drop_column('subscription', 'due_at')
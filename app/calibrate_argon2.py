@@ -0,0 +1,72 @@
+"""
+Measure Argon2 hashing time on this machine and recommend ARGON2_*
+settings that fit a per-login latency budget at a target login rate.
+
+    python -m app.calibrate_argon2 --target-ms 50 --qps 40
+"""
+
+import argparse
+import os
+import statistics
+import time
+
+from argon2 import PasswordHasher
+
+MEMORY_COSTS = [19456, 32768, 47104, 65536, 131072]
+TIME_COSTS = [1, 2, 3, 4, 6, 8]
+SAMPLES = 5
+
+
+def measure(memory_cost: int, time_cost: int, parallelism: int) -> float:
+    """
+    Median seconds per hash for the given parameters.
+    """
+    hasher = PasswordHasher(
+        time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+    )
+    timings = []
+    for _ in range(SAMPLES):
+        started = time.perf_counter()
+        hasher.hash("CalibrationPassw0rd")
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main(target_ms: float, qps: float, workers: int, parallelism: int):
+    print(f"Calibrating with {workers} hashing workers, parallelism={parallelism}")
+    best = None
+    for memory_cost in MEMORY_COSTS:
+        for time_cost in TIME_COSTS:
+            seconds = measure(memory_cost, time_cost, parallelism)
+            capacity = workers / seconds
+            fits = seconds * 1000 <= target_ms and capacity >= qps
+            print(
+                f"memory={memory_cost:>6} time={time_cost} "
+                f"{seconds * 1000:8.1f} ms/hash {capacity:8.1f} logins/s"
+                f"{'  ok' if fits else ''}"
+            )
+            if not fits:
+                # Higher time costs only get slower for this memory cost.
+                break
+            if best is None or memory_cost * time_cost > best[0] * best[1]:
+                best = (memory_cost, time_cost, seconds)
+
+    if best is None:
+        print("No parameters fit the budget; raise --target-ms or add workers")
+        return
+
+    memory_cost, time_cost, seconds = best
+    print(f"\nRecommended ({seconds * 1000:.1f} ms/hash):")
+    print(f"ARGON2_HASH_MEMORY={memory_cost}")
+    print(f"ARGON2_ITERATION_COUNT={time_cost}")
+    print(f"ARGON2_PARALLELISM={parallelism}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target-ms", type=float, default=50)
+    parser.add_argument("--qps", type=float, default=20)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--parallelism", type=int, default=2)
+    args = parser.parse_args()
+    main(args.target_ms, args.qps, args.workers, args.parallelism)
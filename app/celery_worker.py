@@ -1,14 +1,29 @@
+import logging
+import time
+
 from celery import Celery, signals
+from prometheus_client import start_http_server
 
 from app.core import config
+from app.core.log import correlation_id, setup_logging
+from app.core.metrics import (
+    CELERY_TASK_DURATION,
+    CELERY_TASK_QUEUE_WAIT,
+    CELERY_TASKS,
+    metrics_registry,
+)
+from app.core.worker_loop import close_worker_loop, get_worker_loop, run_async
+from app.db import async_engine
 from app.task import multiply
-from app.cron_jobs.invoice import check_active_sub_and_generate_invoice
+from app.cron_jobs.invoice import (
+    bill_due_renewals,
+    check_active_sub_and_generate_invoice,
+    maintain_invoice_partitions_task,
+)
 from celery.schedules import crontab
 
 
-
-print(f"result backend --> {config.settings.CELERY_RESULT_BACKEND}")
-print(f"broker_url --> {config.settings.CELERY_BROKER_URL}")
+logger = logging.getLogger(__name__)
 
 # Create a Celery application
 celery_app = Celery(
@@ -18,15 +33,65 @@ celery_app = Celery(
 )
 
 
+# task_id -> perf_counter() at task start
+_task_started: dict[str, float] = {}
+
+
+@signals.setup_logging.connect
+def configure_logging(**kwargs):
+    """
+    Use the application's queue-based logging instead of Celery's.
+    """
+    setup_logging()
+
+
+@signals.worker_init.connect
+def start_metrics_exporter(**kwargs):
+    """
+    Serve the worker metrics; with a prefork pool set
+    PROMETHEUS_MULTIPROC_DIR so the children's metrics are aggregated.
+    """
+    start_http_server(
+        config.settings.METRICS_WORKER_PORT, registry=metrics_registry()
+    )
+
+
+@signals.before_task_publish.connect
+def task_before_publish_signal_handler(headers=None, **extra):
+    if headers is not None:
+        headers["published_at"] = time.time()
+
+
+@signals.worker_process_init.connect
+def init_worker_process(**kwargs):
+    """
+    Runs in every worker child: drop pooled connections inherited from
+    the parent and open the event loop the billing tasks run on.
+    """
+    async_engine.sync_engine.dispose(close=False)
+    get_worker_loop()
+
+
+@signals.worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    run_async(async_engine.dispose())
+    close_worker_loop()
+
+
 @signals.task_postrun.connect
 def task_post_run_signal_handler(task_id, task, args, kwargs, retval, state, **extra):
-    print(f"Task {task_id} completed with result: {retval}")
+    started = _task_started.pop(task_id, None)
+    CELERY_TASKS.labels(task.name, state).inc()
+    if started is not None:
+        CELERY_TASK_DURATION.labels(task.name, state).observe(
+            time.perf_counter() - started
+        )
 
-    print(f"task ----> {task}")
-    print(f"arguments : --> {args}")
-    print(f"extra --> {extra}")
-    print(f"retry ---> {retval}")
-    print(f"state --> {state}")
+    logger.info(
+        "Task completed",
+        extra={"task_name": task.name, "task_id": task_id, "state": state},
+    )
+    correlation_id.set(None)
 
 
 @signals.task_prerun.connect
@@ -40,17 +105,33 @@ def task_pre_run_signal_handler(task_id, task, args, kwargs, **extra):
     :param kwargs: key word argument passed
     :return: None
     """
-    print(f"Task {task_id} started ")
-    print(f"task_name  in the pre-signals --> {task}")
-    print(f"arguments ins the pre-signals --> {args}")
-    print(f"extra key words --> {extra}")
+    _task_started[task_id] = time.perf_counter()
+    correlation_id.set(task_id)
+    published_at = task.request.get("published_at") or (
+        task.request.headers or {}
+    ).get("published_at")
+    if published_at is not None:
+        CELERY_TASK_QUEUE_WAIT.labels(task.name).observe(
+            max(time.time() - published_at, 0)
+        )
+
+    logger.info("Task started", extra={"task_name": task.name, "task_id": task_id})
 
 
-# Generate the invoice for active subscriptions
+# Bill renewals as they fall due; the daily sweep catches anything the
+# renewal queue missed before the day is over.
 celery_app.conf.beat_schedule = {
+    "bill_due_renewals": {
+        "task": "app.cron_jobs.invoice.bill_due_renewals",
+        "schedule": crontab(minute="*/1"),  # Runs every minute
+    },
     "generate_invoice": {
         "task": "app.cron_jobs.invoice.check_active_sub_and_generate_invoice",
-        "schedule": crontab(minute="*/1"),  # Runs every minute
+        "schedule": crontab(hour=23, minute=45),
+    },
+    "maintain_invoice_partitions": {
+        "task": "app.cron_jobs.invoice.maintain_invoice_partitions_task",
+        "schedule": crontab(hour=1, minute=0),
     },
 }
 celery_app.conf.timezone = "Asia/Kolkata"
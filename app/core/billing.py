@@ -0,0 +1,277 @@
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.metrics import (
+    BILLING_INVOICES,
+    BILLING_RUN_DURATION,
+    BILLING_RUN_INVOICES,
+    BILLING_RUN_ROWS_PER_SECOND,
+)
+from app.core.read_cache import invalidate_subscription_invoice
+from app.db import async_session
+from app.models import BillingRun, Invoice, Plan, Subscription
+from app.utils.enums import BillingRunStatus, InvoiceStatus, SubscriptionStatus
+
+logger = logging.getLogger(__name__)
+
+INVOICE_DUE_DAYS = 7
+
+BILLING_TZ = ZoneInfo(settings.BILLING_TIMEZONE)
+
+
+def billing_today() -> date:
+    """
+    The current day in the billing calendar, whatever the host's timezone.
+    """
+    return datetime.now(BILLING_TZ).date()
+
+
+def billing_day_bounds(day: date) -> tuple[datetime, datetime]:
+    """
+    [start, end) of `day` in the billing calendar, as UTC instants.
+    """
+    start = datetime.combine(day, time.min, tzinfo=BILLING_TZ)
+    end = datetime.combine(day + timedelta(days=1), time.min, tzinfo=BILLING_TZ)
+    return start.astimezone(timezone.utc), end.astimezone(timezone.utc)
+
+
+def expiring_subscriptions_filter(today: date):
+    start, end = billing_day_bounds(today)
+    return (
+        Subscription.status == SubscriptionStatus.ACTIVE.value,
+        Subscription.due_at >= start,
+        Subscription.due_at < end,
+    )
+
+
+def _claim_subscriptions(*where, batch_size: int | None = None):
+    """
+    Lock the matching subscriptions in id order with FOR UPDATE SKIP
+    LOCKED, so overlapping runs skip what another run is already billing.
+    """
+    query = (
+        select(Subscription.id, Subscription.user_id, Subscription.plan_id)
+        .where(*where)
+        .order_by(Subscription.id)
+        .with_for_update(skip_locked=True, of=Subscription)
+    )
+    if batch_size is not None:
+        query = query.limit(batch_size)
+    return query
+
+
+def _invoice_batch(claim, today: date):
+    """
+    One statement that bills the subscriptions selected by `claim`: lock
+    them, mark them expired and insert their invoices priced from the
+    plan table. Returns the (id, user_id) of every subscription billed,
+    in id order, so a batch costs a single round trip.
+    """
+    batch = claim.cte("batch")
+
+    # Core DML on the tables: ORM-enabled DML can't be nested in a CTE.
+    subscription, plan = Subscription.__table__, Plan.__table__
+    expired = (
+        update(subscription)
+        .where(subscription.c.id == batch.c.id)
+        .values(status=SubscriptionStatus.EXPIRED.value)
+        .returning(subscription.c.id, subscription.c.user_id, batch.c.plan_id)
+        .cte("expired")
+    )
+
+    invoiced = (
+        insert(Invoice.__table__)
+        .from_select(
+            ["user_id", "subscription_id", "amount", "issue_date", "due_date", "status"],
+            select(
+                expired.c.user_id,
+                expired.c.id,
+                plan.c.price,
+                literal(today),
+                literal(today + timedelta(days=INVOICE_DUE_DAYS)),
+                literal(InvoiceStatus.unpaid.value),
+            ).join_from(expired, plan, plan.c.id == expired.c.plan_id),
+        )
+        .on_conflict_do_nothing(index_elements=["subscription_id", "issue_date"])
+        .returning(Invoice.__table__.c.id)
+        .cte("invoiced")
+    )
+
+    # Data-modifying CTEs only run when referenced; count the inserts.
+    return select(
+        expired.c.id,
+        expired.c.user_id,
+        select(func.count()).select_from(invoiced).scalar_subquery().label("invoiced"),
+    ).order_by(expired.c.id)
+
+
+async def _record_batch(rows) -> int:
+    """
+    Post-commit bookkeeping for a billed batch.
+
+    :return: number of invoices the batch inserted
+    """
+    if not rows:
+        return 0
+    await invalidate_subscription_invoice(*{row.user_id for row in rows})
+    if logger.isEnabledFor(logging.DEBUG):
+        for row in rows:
+            logger.debug(
+                "Invoice generated",
+                extra={"subscription_id": row.id, "sampled": True},
+            )
+    invoiced = rows[0].invoiced
+    BILLING_INVOICES.inc(invoiced)
+    return invoiced
+
+
+async def get_billing_shards(
+    session: AsyncSession, today: date, shard_size: int, max_shards: int
+):
+    """
+    Split the subscriptions ending on `today` into contiguous id ranges of
+    roughly `shard_size` rows each, capped at `max_shards` ranges.
+
+    :return: list of (start_id, end_id) tuples, both inclusive
+    """
+    total = (
+        await session.execute(
+            select(func.count(Subscription.id)).where(
+                *expiring_subscriptions_filter(today)
+            )
+        )
+    ).scalar_one()
+    if not total:
+        return []
+
+    shard_count = min(-(-total // shard_size), max_shards)
+    ranked = (
+        select(
+            Subscription.id,
+            func.ntile(shard_count).over(order_by=Subscription.id).label("shard"),
+        )
+        .where(*expiring_subscriptions_filter(today))
+        .subquery()
+    )
+    rows = (
+        await session.execute(
+            select(func.min(ranked.c.id), func.max(ranked.c.id))
+            .group_by(ranked.c.shard)
+            .order_by(ranked.c.shard)
+        )
+    ).all()
+    return [(start_id, end_id) for start_id, end_id in rows]
+
+
+async def generate_invoices(
+    session: AsyncSession,
+    today: date,
+    batch_size: int,
+    start_id: int | None = None,
+    end_id: int | None = None,
+) -> int:
+    """
+    Generate invoices for the subscriptions ending on `today` in chunks
+    of `batch_size`, committing after each chunk so no transaction holds
+    more than one batch of row locks. `start_id`/`end_id` restrict the
+    run to an inclusive subscription id range.
+
+    :return: number of invoices generated
+    """
+    processed = 0
+    last_id = start_id - 1 if start_id is not None else 0
+    while True:
+        where = [*expiring_subscriptions_filter(today), Subscription.id > last_id]
+        if end_id is not None:
+            where.append(Subscription.id <= end_id)
+        rows = (
+            await session.execute(
+                _invoice_batch(_claim_subscriptions(*where, batch_size=batch_size), today)
+            )
+        ).all()
+        await session.commit()
+        if not rows:
+            break
+
+        processed += await _record_batch(rows)
+        last_id = rows[-1].id
+        logger.info("Invoices generated so far: %s", processed)
+
+    return processed
+
+
+async def bill_subscriptions(
+    session: AsyncSession, subscription_ids: list[int], today: date
+) -> int:
+    """
+    Bill the given subscriptions, skipping any that are no longer active
+    or are being billed by another run, and commit.
+
+    :return: number of invoices generated
+    """
+    if not subscription_ids:
+        return 0
+    claim = _claim_subscriptions(
+        Subscription.status == SubscriptionStatus.ACTIVE.value,
+        Subscription.id.in_(subscription_ids),
+    )
+    rows = (await session.execute(_invoice_batch(claim, today))).all()
+    await session.commit()
+    return await _record_batch(rows)
+
+
+async def generate_invoice_range(
+    today: date, batch_size: int, start_id: int | None = None, end_id: int | None = None
+) -> int:
+    """
+    `generate_invoices` in a session of its own, for callers outside a
+    request, e.g. a billing shard task.
+    """
+    async with async_session() as session:
+        return await generate_invoices(session, today, batch_size, start_id, end_id)
+
+
+async def start_billing_run(today: date, shard_size: int, max_shards: int):
+    """
+    Shard the subscriptions ending on `today` and open a ledger entry.
+
+    :return: (billing run id, list of shards)
+    """
+    async with async_session() as session:
+        shards = await get_billing_shards(session, today, shard_size, max_shards)
+        run = BillingRun(
+            billing_date=today,
+            status=BillingRunStatus.RUNNING.value,
+            shards=len(shards),
+        )
+        session.add(run)
+        await session.commit()
+        return run.id, shards
+
+
+async def finish_billing_run(
+    run_id: int, status: BillingRunStatus, invoices: int = 0
+):
+    finished_on = datetime.now(timezone.utc)
+    async with async_session() as session:
+        started_on = (
+            await session.execute(
+                update(BillingRun)
+                .where(BillingRun.id == run_id)
+                .values(status=status.value, invoices=invoices, finished_on=finished_on)
+                .returning(BillingRun.started_on)
+            )
+        ).scalar_one()
+        await session.commit()
+
+    if status == BillingRunStatus.COMPLETED and started_on is not None:
+        duration = (finished_on - started_on).total_seconds()
+        BILLING_RUN_INVOICES.set(invoices)
+        BILLING_RUN_DURATION.set(duration)
+        BILLING_RUN_ROWS_PER_SECOND.set(invoices / duration if duration > 0 else 0)
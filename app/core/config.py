@@ -1,3 +1,4 @@
+import logging
 import os
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
@@ -6,10 +7,18 @@ from typing import Dict
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
 
 class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "default_secret")
-    HASHING_ALGORITHM: str = os.getenv("HASHING_ALGORITHM", "bcrypt")
+    JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
+    # HMAC secret or PEM private key; defaults to SECRET_KEY
+    JWT_SIGNING_KEY: str = os.getenv("JWT_SIGNING_KEY", "")
+    JWT_KEY_ID: str = os.getenv("JWT_KEY_ID", "default")
+    # Retired keys still accepted: {"kid": {"algorithm": ..., "key": ...}}
+    JWT_VERIFICATION_KEYS: str = os.getenv("JWT_VERIFICATION_KEYS", "")
+    JWT_CLAIMS_CACHE_SIZE: int = int(os.getenv("JWT_CLAIMS_CACHE_SIZE", 10000))
     ARGON2_HASH_MEMORY: int = int(os.getenv("ARGON2_HASH_MEMORY", 65536))
     ARGON2_ITERATION_COUNT: int = int(os.getenv("ARGON2_ITERATION_COUNT", 4))
     ARGON2_PARALLELISM: int = int(os.getenv("ARGON2_PARALLELISM", 2))
@@ -21,42 +30,81 @@ class Settings(BaseSettings):
         os.getenv("USER_VERIFY_TOKEN_EXPIRE_MINUTES", 15)
     )
 
+    PASSWORD_HASH_EXECUTOR: str = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+    PASSWORD_HASH_WORKERS: int = int(
+        os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1)
+    )
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 64))
+    PASSWORD_REHASH_BATCH_SIZE: int = int(os.getenv("PASSWORD_REHASH_BATCH_SIZE", 100))
+    PASSWORD_REHASH_FLUSH_SECONDS: int = int(
+        os.getenv("PASSWORD_REHASH_FLUSH_SECONDS", 30)
+    )
+
     DEFAULT_DATABASE_HOST: str = os.getenv("DEFAULT_DATABASE_HOST", "localhost")
     DEFAULT_DATABASE_USER: str = os.getenv("DEFAULT_DATABASE_USER", "user")
     DEFAULT_DATABASE_PASSWORD: str = os.getenv("DEFAULT_DATABASE_PASSWORD", "password")
     DEFAULT_DATABASE_PORT: str = os.getenv("DEFAULT_DATABASE_PORT", "5432")
     DEFAULT_DATABASE_DB: str = os.getenv("DEFAULT_DATABASE_DB", "postgres")
     DATABASE_URI: str = ""
-    DATABASE_SYNC_URI: str = ""
+
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 30))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    DB_PGBOUNCER: bool = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
 
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
     CELERY_RESULT_BACKEND: str = os.getenv(
         "CELERY_RESULT_BACKEND", "redis://localhost:6379/0"
     )
 
-    @field_validator("DATABASE_SYNC_URI")
-    def build_sync_db_uri(cls, v: str, values: Dict[str, str]) -> str:
-        """
-        Build a synchronous PostgreSQL DB URI using psycopg2 driver.
-        """
-        values = values.data
-        return str(
-            AnyUrl.build(
-                scheme="postgresql+psycopg2",
-                username=values["DEFAULT_DATABASE_USER"],
-                password=values["DEFAULT_DATABASE_PASSWORD"],
-                host=values["DEFAULT_DATABASE_HOST"],
-                port=int(values["DEFAULT_DATABASE_PORT"]),
-                path=values["DEFAULT_DATABASE_DB"],
-            )
-        )
+    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+    EVENT_BUS_FLUSH_SECONDS: float = float(os.getenv("EVENT_BUS_FLUSH_SECONDS", 0.5))
+    EVENT_BUS_MAX_BATCH: int = int(os.getenv("EVENT_BUS_MAX_BATCH", 5000))
+    PLAN_CATALOG_REFRESH_SECONDS: int = int(
+        os.getenv("PLAN_CATALOG_REFRESH_SECONDS", 30)
+    )
+    READ_CACHE_TTL: int = int(os.getenv("READ_CACHE_TTL", 300))
+
+    AUTH_CACHE_TTL: int = int(os.getenv("AUTH_CACHE_TTL", 60))
+    AUTH_CACHE_SIZE: int = int(os.getenv("AUTH_CACHE_SIZE", 10000))
+    AUTH_CACHE_REDIS: bool = os.getenv("AUTH_CACHE_REDIS", "false").lower() == "true"
+
+    CRUD_BULK_CHUNK_SIZE: int = int(os.getenv("CRUD_BULK_CHUNK_SIZE", 1000))
+
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # Per-module overrides, e.g. "app.cron_jobs=DEBUG,sqlalchemy.engine=WARNING"
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "")
+    LOG_SAMPLE_RATE: float = float(os.getenv("LOG_SAMPLE_RATE", 0.01))
+
+    # "off", "header" (X-SQL-Profile: 1) or "always"; opt in per deployment,
+    # since "header" lets any client ask for a Server-Timing breakdown
+    SQL_PROFILING: str = os.getenv("SQL_PROFILING", "off")
+    SQL_SLOW_REQUEST_MS: float = float(os.getenv("SQL_SLOW_REQUEST_MS", 200))
+    SQL_SLOW_QUERY_MS: float = float(os.getenv("SQL_SLOW_QUERY_MS", 500))
+
+    METRICS_WORKER_PORT: int = int(os.getenv("METRICS_WORKER_PORT", 9808))
+
+    # Calendar that decides which day a subscription is billed on
+    BILLING_TIMEZONE: str = os.getenv("BILLING_TIMEZONE", "Asia/Kolkata")
+    INVOICE_BATCH_SIZE: int = int(os.getenv("INVOICE_BATCH_SIZE", 1000))
+    BILLING_SHARD_SIZE: int = int(os.getenv("BILLING_SHARD_SIZE", 10000))
+    BILLING_MAX_PARALLELISM: int = int(os.getenv("BILLING_MAX_PARALLELISM", 16))
+    BILLING_LOCK_TIMEOUT: int = int(os.getenv("BILLING_LOCK_TIMEOUT", 3600))
+    RENEWAL_BATCH_SIZE: int = int(os.getenv("RENEWAL_BATCH_SIZE", 500))
+    INVOICE_PARTITIONS_AHEAD: int = int(os.getenv("INVOICE_PARTITIONS_AHEAD", 3))
+    # Months of invoice partitions kept attached; 0 keeps them all
+    INVOICE_PARTITION_RETENTION_MONTHS: int = int(
+        os.getenv("INVOICE_PARTITION_RETENTION_MONTHS", 0)
+    )
 
     @field_validator("DATABASE_URI")
     def build_db_uri(cls, v: str, values: Dict[str, str]) -> str:
         """
         Build the Database URI using the class fields.
         """
-        print(f"values data {values}")
         values = values.data
         db_url = AnyUrl.build(
             scheme="postgresql+asyncpg",
@@ -66,9 +114,8 @@ class Settings(BaseSettings):
             port=int(values["DEFAULT_DATABASE_PORT"]),
             path=values["DEFAULT_DATABASE_DB"],
         )
-        print(f"Database Url {db_url}")
+        logger.debug("Database host %s", values["DEFAULT_DATABASE_HOST"])
         return str(db_url)
 
 
 settings = Settings()
-print(f"Database URI: {settings.DATABASE_URI}")
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import logging
+from collections import defaultdict
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+import asyncpg
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EVENTS_CHANNEL = "billing_events"
+RECONNECT_DELAY_SECONDS = 5
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    table: str
+    op: str
+    id: int
+    user_id: int | None = None
+
+
+Handler = Callable[[list[ChangeEvent]], Awaitable[None]]
+
+
+class EventBus:
+    """
+    Listens for row-change notifications published by the database
+    triggers and hands them to in-process subscribers in coalesced
+    batches: every flush delivers each changed row at most once, so a
+    billing run touching 100k rows costs a handful of handler calls.
+    """
+
+    def __init__(self, channel: str, flush_interval: float, max_batch: int):
+        self.channel = channel
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._subscribers: dict[str, list[Handler]] = defaultdict(list)
+        self._pending: dict[tuple[str, int], ChangeEvent] = {}
+        self._flush_now: asyncio.Event | None = None
+        self._tasks: list[asyncio.Task] = []
+
+    def subscribe(self, table: str, handler: Handler):
+        self._subscribers[table].append(handler)
+
+    def _on_notification(self, connection, pid, channel, payload):
+        try:
+            event = ChangeEvent(**json.loads(payload))
+        except Exception as e:
+            logger.warning("Ignoring malformed notification %r: %s", payload, e)
+            return
+        # Later changes to the same row replace earlier ones.
+        self._pending[(event.table, event.id)] = event
+        if len(self._pending) >= self.max_batch:
+            self._flush_now.set()
+
+    async def _dispatch(self):
+        batch, self._pending = self._pending, {}
+        by_table: dict[str, list[ChangeEvent]] = defaultdict(list)
+        for event in batch.values():
+            by_table[event.table].append(event)
+        for table, events in by_table.items():
+            for handler in self._subscribers.get(table, []):
+                try:
+                    await handler(events)
+                except Exception as e:
+                    logger.exception(
+                        "Error in %s event handler %s: %s", table, handler.__name__, e
+                    )
+
+    async def _dispatch_loop(self):
+        while True:
+            with suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._flush_now.wait(), self.flush_interval)
+            self._flush_now.clear()
+            if self._pending:
+                await self._dispatch()
+
+    async def _listen_loop(self):
+        dsn = settings.DATABASE_URI.replace("postgresql+asyncpg://", "postgresql://")
+        while True:
+            conn = None
+            try:
+                conn = await asyncpg.connect(dsn)
+                await conn.add_listener(self.channel, self._on_notification)
+                while not conn.is_closed():
+                    await asyncio.sleep(1)
+                logger.warning("Notification listener connection closed, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.exception("Notification listener error: %s", e)
+            finally:
+                if conn is not None and not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(RECONNECT_DELAY_SECONDS)
+
+    async def start(self):
+        self._flush_now = asyncio.Event()
+        self._tasks = [
+            asyncio.create_task(self._listen_loop()),
+            asyncio.create_task(self._dispatch_loop()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+        if self._pending:
+            await self._dispatch()
+
+
+event_bus = EventBus(
+    EVENTS_CHANNEL,
+    flush_interval=settings.EVENT_BUS_FLUSH_SECONDS,
+    max_batch=settings.EVENT_BUS_MAX_BATCH,
+)
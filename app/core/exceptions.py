@@ -87,4 +87,11 @@ class ServerError(HTTPException):
         self.headers = headers
 
 
-
+class TooManyRequests(HTTPException):
+    def __init__(
+        self,
+        detail: Any = "Server is busy, try again later",
+        headers: dict[str, Any] = None,
+    ) -> None:
+        super().__init__(status_code=status.HTTP_429_TOO_MANY_REQUESTS, detail=detail)
+        self.headers = headers if headers is not None else {"Retry-After": "1"}
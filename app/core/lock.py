@@ -0,0 +1,24 @@
+from redis import Redis
+
+# Only delete the key if it still holds our token, so a run whose lock
+# already expired can never release the lock of the run that replaced it.
+_RELEASE_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
+def acquire_lock(client: Redis, name: str, token: str, timeout: int) -> bool:
+    """
+    Try to take the lock `name` for `timeout` seconds without blocking.
+    """
+    return bool(client.set(name, token, nx=True, ex=timeout))
+
+
+def release_lock(client: Redis, name: str, token: str) -> bool:
+    """
+    Release the lock `name` if it is still held with `token`.
+    """
+    return bool(client.eval(_RELEASE_SCRIPT, 1, name, token))
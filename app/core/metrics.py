@@ -0,0 +1,168 @@
+import os
+import time
+from contextvars import ContextVar
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from starlette.routing import Match
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests", ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"]
+)
+HTTP_REQUEST_SQL_STATEMENTS = Histogram(
+    "http_request_sql_statements",
+    "SQL statements issued per HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 50),
+)
+SQL_STATEMENT_DURATION = Histogram(
+    "sql_statement_duration_seconds", "SQL statement latency", ["engine"]
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pooled connection", ["engine"]
+)
+DB_POOL_HELD = Histogram(
+    "db_pool_checkout_seconds", "Time a connection stays checked out", ["engine"]
+)
+DB_POOL_IN_USE = Gauge(
+    "db_pool_checked_out", "Connections currently checked out", ["engine"],
+    multiprocess_mode="livesum",
+)
+
+CELERY_TASKS = Counter("celery_tasks_total", "Celery tasks run", ["task", "state"])
+CELERY_TASK_DURATION = Histogram(
+    "celery_task_duration_seconds", "Celery task run time", ["task", "state"]
+)
+CELERY_TASK_QUEUE_WAIT = Histogram(
+    "celery_task_queue_wait_seconds",
+    "Time between publishing a task and a worker starting it",
+    ["task"],
+)
+
+BILLING_INVOICES = Counter("billing_invoices_total", "Invoices generated")
+BILLING_RUN_INVOICES = Gauge(
+    "billing_run_invoices", "Invoices generated by the last billing run",
+    multiprocess_mode="liveall",
+)
+BILLING_RUN_DURATION = Gauge(
+    "billing_run_duration_seconds", "Duration of the last billing run",
+    multiprocess_mode="liveall",
+)
+BILLING_RUN_ROWS_PER_SECOND = Gauge(
+    "billing_run_rows_per_second", "Throughput of the last billing run",
+    multiprocess_mode="liveall",
+)
+
+# [statement count, SQL seconds] for the HTTP request being served
+_request_sql: ContextVar[list | None] = ContextVar("request_sql", default=None)
+
+
+def metrics_registry():
+    """
+    Registry to expose: aggregated across processes when
+    PROMETHEUS_MULTIPROC_DIR is set (multiple uvicorn or Celery worker
+    processes), otherwise the default in-process registry.
+    """
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+def render_metrics() -> tuple[bytes, str]:
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def instrument_engine(engine, name: str):
+    """
+    Time every statement and attribute it to the current HTTP request,
+    and feed the pool statistics into the pool histograms.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        SQL_STATEMENT_DURATION.labels(name).observe(elapsed)
+        request_sql = _request_sql.get()
+        if request_sql is not None:
+            request_sql[0] += 1
+            request_sql[1] += elapsed
+
+    stats = getattr(engine.pool, "stats", None)
+    if stats is not None:
+        wait, held = DB_POOL_WAIT.labels(name), DB_POOL_HELD.labels(name)
+        in_use = DB_POOL_IN_USE.labels(name)
+
+        def _observe(kind, seconds):
+            if kind == "wait":
+                wait.observe(seconds)
+                in_use.inc()
+            else:
+                held.observe(seconds)
+                in_use.dec()
+
+        stats.observers.append(_observe)
+
+
+def _route_label(app, scope) -> str:
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+    return "<unmatched>"
+
+
+class PrometheusMiddleware:
+    """
+    Pure ASGI middleware recording request count, latency and SQL
+    statements per route template (never the raw path, to keep label
+    cardinality bounded).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = _route_label(scope["app"], scope)
+        method = scope["method"]
+        status_code = 500
+        request_sql = [0, 0.0]
+        token = _request_sql.set(request_sql)
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_sql.reset(token)
+            HTTP_REQUEST_DURATION.labels(method, route).observe(
+                time.perf_counter() - started
+            )
+            HTTP_REQUESTS.labels(method, route, status_code).inc()
+            HTTP_REQUEST_SQL_STATEMENTS.labels(route).observe(request_sql[0])
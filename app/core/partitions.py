@@ -0,0 +1,124 @@
+import logging
+import re
+from datetime import date
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from app.db import async_engine
+
+logger = logging.getLogger(__name__)
+
+INVOICE_TABLE = "invoice"
+INVOICE_ARCHIVE_SCHEMA = "invoice_archive"
+
+_PARTITION_NAME = re.compile(r"^invoice_p(\d{4})(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def invoice_partition_name(month: date) -> str:
+    return f"invoice_p{month:%Y%m}"
+
+
+async def _attached_partitions(conn: AsyncConnection) -> dict[date, str]:
+    rows = await conn.execute(
+        text(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = :table
+            """
+        ),
+        {"table": INVOICE_TABLE},
+    )
+    partitions = {}
+    for (name,) in rows:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            partitions[date(int(match[1]), int(match[2]), 1)] = name
+    return partitions
+
+
+async def create_invoice_partitions(
+    conn: AsyncConnection,
+    today: date,
+    months_ahead: int,
+    since: date | None = None,
+) -> list[str]:
+    """
+    Make sure the monthly partitions from the month of `since` (default:
+    the current month) through `months_ahead` months after the current
+    one exist. Pass `since` before loading backdated invoices.
+
+    :return: names of the partitions created
+    """
+    existing = await _attached_partitions(conn)
+    created = []
+    month = month_start(since or today)
+    last = add_months(month_start(today), months_ahead)
+    while month <= last:
+        if month not in existing:
+            name = invoice_partition_name(month)
+            await conn.execute(
+                text(
+                    f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {INVOICE_TABLE} "
+                    f"FOR VALUES FROM ('{month}') TO ('{add_months(month, 1)}')"
+                )
+            )
+            created.append(name)
+        month = add_months(month, 1)
+    return created
+
+
+async def archive_invoice_partitions(
+    conn: AsyncConnection, today: date, retention_months: int
+) -> list[str]:
+    """
+    Detach the monthly partitions older than `retention_months` and move
+    them to the invoice_archive schema, where they stay queryable but no
+    longer weigh on the live table.
+
+    :return: names of the partitions archived
+    """
+    cutoff = add_months(month_start(today), -retention_months)
+    archived = []
+    for month, name in sorted((await _attached_partitions(conn)).items()):
+        if month >= cutoff:
+            break
+        await conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {INVOICE_ARCHIVE_SCHEMA}"))
+        await conn.execute(text(f"ALTER TABLE {INVOICE_TABLE} DETACH PARTITION {name}"))
+        await conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {INVOICE_ARCHIVE_SCHEMA}"))
+        archived.append(name)
+    return archived
+
+
+async def maintain_invoice_partitions(
+    today: date, months_ahead: int, retention_months: int
+) -> dict:
+    """
+    Pre-create the upcoming invoice partitions and, when `retention_months`
+    is set, archive the expired ones. Each DDL statement commits on its
+    own so no lock on the invoice table is held longer than one statement.
+    """
+    async with async_engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        created = await create_invoice_partitions(conn, today, months_ahead)
+        archived = []
+        if retention_months > 0:
+            archived = await archive_invoice_partitions(conn, today, retention_months)
+
+    for name in created:
+        logger.info("Created invoice partition %s", name)
+    for name in archived:
+        logger.info("Archived invoice partition %s", name)
+    return {"created": created, "archived": archived}
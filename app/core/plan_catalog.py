@@ -0,0 +1,127 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Iterable
+
+from redis.exceptions import RedisError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis_client import get_async_redis, get_redis
+from app.db import async_session
+from app.models import Plan
+
+logger = logging.getLogger(__name__)
+
+PLAN_CATALOG_VERSION_KEY = "plan_catalog:version"
+
+
+@dataclass(frozen=True)
+class PlanSnapshot:
+    id: int
+    name: str
+    price: int
+
+
+class PlanCatalog:
+    """
+    Process-local, read-only view of the plan table. Reloads build new
+    indexes and swap them in whole, so readers never see a partial update.
+    """
+
+    def __init__(self):
+        self._by_id: MappingProxyType = MappingProxyType({})
+        self._by_name: MappingProxyType = MappingProxyType({})
+        self.version: int | None = None
+
+    def replace(self, plans: Iterable[Plan], version: int | None):
+        snapshots = [
+            PlanSnapshot(id=plan.id, name=plan.name, price=plan.price)
+            for plan in plans
+        ]
+        self._by_id, self._by_name = (
+            MappingProxyType({plan.id: plan for plan in snapshots}),
+            MappingProxyType({plan.name: plan for plan in snapshots}),
+        )
+        self.version = version
+
+    def get(self, plan_id: int) -> PlanSnapshot | None:
+        return self._by_id.get(plan_id)
+
+    def get_by_name(self, name: str) -> PlanSnapshot | None:
+        return self._by_name.get(name)
+
+    def all(self) -> list[PlanSnapshot]:
+        return list(self._by_id.values())
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+
+plan_catalog = PlanCatalog()
+
+
+def _parse_version(value) -> int:
+    return int(value) if value is not None else 0
+
+
+async def _current_version() -> int | None:
+    try:
+        return _parse_version(await get_async_redis().get(PLAN_CATALOG_VERSION_KEY))
+    except RedisError as e:
+        logger.warning("Plan catalog version unavailable: %s", e)
+        return None
+
+
+async def load_plan_catalog(session: AsyncSession):
+    version = await _current_version()
+    plans = (await session.execute(select(Plan))).scalars().all()
+    plan_catalog.replace(plans, version)
+
+
+async def refresh_plan_catalog(session: AsyncSession):
+    """
+    Reload the catalog if the plan version counter moved since the last load.
+    """
+    version = await _current_version()
+    if version is None or version != plan_catalog.version:
+        await load_plan_catalog(session)
+
+
+async def run_plan_catalog_refresher():
+    """
+    Poll the plan version counter for the lifetime of the app.
+    """
+    while True:
+        await asyncio.sleep(settings.PLAN_CATALOG_REFRESH_SECONDS)
+        try:
+            async with async_session() as session:
+                await refresh_plan_catalog(session)
+        except Exception as e:
+            logger.exception("Error while refreshing the plan catalog: %s", e)
+
+
+async def on_plan_change(events):
+    """
+    Event bus subscriber: reload as soon as any plan row changes.
+    """
+    async with async_session() as session:
+        await load_plan_catalog(session)
+
+
+def bump_plan_catalog_version():
+    """
+    Call after changing the plan table so every process reloads its catalog.
+    """
+    get_redis().incr(PLAN_CATALOG_VERSION_KEY)
+
+
+async def resolve_plan_by_name(session: AsyncSession, name: str) -> PlanSnapshot | None:
+    plan = plan_catalog.get_by_name(name)
+    if plan is None:
+        # Unknown name, or a plan added since the last load: reload once.
+        await load_plan_catalog(session)
+        plan = plan_catalog.get_by_name(name)
+    return plan
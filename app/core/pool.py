@@ -0,0 +1,150 @@
+import time
+from dataclasses import dataclass, field
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+
+from app.core.config import settings
+
+
+@dataclass
+class PoolStats:
+    """
+    Running totals for one engine's pool. `wait` is the time spent
+    blocked waiting for a free connection, `held` is how long a
+    connection stayed checked out.
+    """
+    checkouts: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    held_seconds_total: float = 0.0
+    held_seconds_max: float = 0.0
+    timeouts: int = 0
+    observers: list = field(default_factory=list, repr=False)
+
+    def record_wait(self, seconds: float):
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+        for observer in self.observers:
+            observer("wait", seconds)
+
+    def record_held(self, seconds: float):
+        self.held_seconds_total += seconds
+        self.held_seconds_max = max(self.held_seconds_max, seconds)
+        for observer in self.observers:
+            observer("held", seconds)
+
+
+class _TimedCheckoutMixin:
+    stats: PoolStats
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.stats.timeouts += 1
+            raise
+        self.stats.record_wait(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+class InstrumentedAsyncAdaptedQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+
+def engine_options(is_async: bool) -> dict:
+    """
+    create_engine keyword arguments built from the DB_POOL_* settings.
+
+    With DB_PGBOUNCER the pooling is left to PgBouncer and asyncpg's
+    prepared statement caches are disabled, since PgBouncer in
+    transaction mode may run each statement on a different server
+    connection. The statements asyncpg still prepares get unique names
+    so they never collide with one left on a shared server connection.
+    """
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if settings.DB_PGBOUNCER:
+        options["poolclass"] = NullPool
+        if is_async:
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+
+    options.update(
+        poolclass=InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def instrument_pool(engine):
+    """
+    Track how long each connection is held between checkout and checkin.
+    """
+    pool = engine.pool
+    if not hasattr(pool, "stats"):
+        return
+
+    @event.listens_for(engine, "checkout")
+    def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "checkin")
+    def _on_checkin(dbapi_connection, connection_record):
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            engine.pool.stats.record_held(time.perf_counter() - checked_out_at)
+
+
+def pool_status(engine) -> dict:
+    """
+    Current pool occupancy plus the running PoolStats totals.
+    """
+    pool = engine.pool
+    status = {"pool": pool.__class__.__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            checked_in=pool.checkedin(),
+        )
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(
+            checkouts=stats.checkouts,
+            wait_seconds_total=stats.wait_seconds_total,
+            wait_seconds_max=stats.wait_seconds_max,
+            held_seconds_total=stats.held_seconds_total,
+            held_seconds_max=stats.held_seconds_max,
+            timeouts=stats.timeouts,
+        )
+    return status
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import logging
+from typing import Any
+
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis_client import get_async_redis
+
+logger = logging.getLogger(__name__)
+
+# Read models are kept in Redis so that writers in any process, including
+# the Celery billing workers, can invalidate them.
+
+
+def subscription_invoice_key(user_id: int) -> str:
+    return f"subscription_invoice:{user_id}"
+
+
+def make_etag(payload: Any) -> str:
+    digest = hashlib.sha1(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+async def get_cached(key: str) -> dict | None:
+    """
+    Cached {"etag": ..., "payload": ...} entry, or None on a miss or
+    when Redis is unavailable.
+    """
+    try:
+        cached = await get_async_redis().get(key)
+    except RedisError as e:
+        logger.warning("Read cache unavailable: %s", e)
+        return None
+    return json.loads(cached) if cached is not None else None
+
+
+async def set_cached(key: str, payload: Any, ttl: int | None = None) -> str:
+    etag = make_etag(payload)
+    try:
+        await get_async_redis().set(
+            key,
+            json.dumps({"etag": etag, "payload": payload}, default=str),
+            ex=ttl or settings.READ_CACHE_TTL,
+        )
+    except RedisError as e:
+        logger.warning("Read cache unavailable: %s", e)
+    return etag
+
+
+async def invalidate_subscription_invoice(*user_ids: int):
+    if not user_ids:
+        return
+    try:
+        await get_async_redis().delete(
+            *(subscription_invoice_key(user_id) for user_id in user_ids)
+        )
+    except RedisError as e:
+        logger.warning("Read cache unavailable: %s", e)
+
+
+async def on_billing_rows_change(events):
+    """
+    Event bus subscriber: drop the read models of every user whose
+    subscription or invoice rows changed, whoever the writer was.
+    """
+    await invalidate_subscription_invoice(
+        *{event.user_id for event in events if event.user_id is not None}
+    )
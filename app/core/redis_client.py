@@ -0,0 +1,22 @@
+from functools import lru_cache
+
+from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
+
+from app.core.config import settings
+
+
+@lru_cache
+def get_redis() -> Redis:
+    """
+    Process-wide Redis client built from REDIS_URL.
+    """
+    return Redis.from_url(settings.REDIS_URL)
+
+
+@lru_cache
+def get_async_redis() -> AsyncRedis:
+    """
+    Process-wide asyncio Redis client built from REDIS_URL.
+    """
+    return AsyncRedis.from_url(settings.REDIS_URL)
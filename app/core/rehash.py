@@ -0,0 +1,88 @@
+import asyncio
+import logging
+
+from sqlalchemy import bindparam, update
+
+from app.core import exceptions
+from app.core.config import settings
+from app.core.security import get_hashed_password_async
+from app.db import async_engine
+from app.models import User
+
+logger = logging.getLogger(__name__)
+
+# user_id -> (hash the user logged in with, replacement hash)
+_pending: dict[int, tuple[str, str]] = {}
+_tasks: set[asyncio.Task] = set()
+
+
+def schedule_rehash(user_id: int, password: str, old_hash: str):
+    """
+    Re-hash a password made with outdated ARGON2_* parameters in the
+    background; the login response does not wait for it.
+    """
+    task = asyncio.create_task(_rehash(user_id, password, old_hash))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+async def _rehash(user_id: int, password: str, old_hash: str):
+    try:
+        new_hash = await get_hashed_password_async(password)
+    except exceptions.TooManyRequests:
+        # The pool is saturated; the next login will try again.
+        return
+    _pending[user_id] = (old_hash, new_hash)
+    if len(_pending) >= settings.PASSWORD_REHASH_BATCH_SIZE:
+        await flush_rehashes()
+
+
+async def flush_rehashes() -> int:
+    """
+    Write every pending hash in a single executemany UPDATE. Rows whose
+    password changed since the login are left alone.
+    """
+    if not _pending:
+        return 0
+    batch = list(_pending.items())
+    _pending.clear()
+
+    users = User.__table__
+    query = (
+        update(users)
+        .where(
+            users.c.id == bindparam("b_id"),
+            users.c.password == bindparam("b_old_password"),
+        )
+        .values(password=bindparam("b_new_password"))
+    )
+    async with async_engine.begin() as conn:
+        await conn.execute(
+            query,
+            [
+                {"b_id": user_id, "b_old_password": old, "b_new_password": new}
+                for user_id, (old, new) in batch
+            ],
+        )
+    return len(batch)
+
+
+async def drain_rehashes() -> int:
+    """
+    Wait for in-flight re-hashes and write them out; used on shutdown.
+    """
+    if _tasks:
+        await asyncio.gather(*_tasks, return_exceptions=True)
+    return await flush_rehashes()
+
+
+async def run_rehash_flusher():
+    """
+    Periodically flush pending re-hashes; runs for the lifetime of the app.
+    """
+    while True:
+        await asyncio.sleep(settings.PASSWORD_REHASH_FLUSH_SECONDS)
+        try:
+            await flush_rehashes()
+        except Exception as e:
+            logger.exception("Error while flushing password re-hashes: %s", e)
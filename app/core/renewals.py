@@ -0,0 +1,144 @@
+import logging
+from datetime import date, datetime, timezone
+
+from redis.exceptions import RedisError
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+
+from app.core.billing import bill_subscriptions, billing_today
+from app.core.redis_client import get_async_redis
+from app.db import async_session
+from app.models import RenewalQueue
+
+logger = logging.getLogger(__name__)
+
+# Sorted set of subscription ids scored by the epoch second they fall due.
+RENEWAL_QUEUE_KEY = "renewals:due"
+
+# Pop up to ARGV[2] members due at or before ARGV[1] in one atomic step,
+# so two workers never receive the same subscription.
+_POP_DUE_SCRIPT = """
+local ids = redis.call("zrangebyscore", KEYS[1], "-inf", ARGV[1], "limit", 0, ARGV[2])
+if #ids > 0 then
+    redis.call("zrem", KEYS[1], unpack(ids))
+end
+return ids
+"""
+
+
+def _aware(value: datetime) -> datetime:
+    # Naive datetimes are taken to be UTC.
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+async def schedule_renewal(subscription_id: int, due_at: datetime):
+    """
+    Queue `subscription_id` to be billed once `due_at` has passed. Call
+    after the subscription is committed, on subscribe and on every
+    renewal. Falls back to the renewal_queue table when Redis is down.
+    """
+    due_at = _aware(due_at)
+    try:
+        await get_async_redis().zadd(
+            RENEWAL_QUEUE_KEY, {str(subscription_id): due_at.timestamp()}
+        )
+        return
+    except RedisError as e:
+        logger.warning("Renewal queue unavailable, using fallback table: %s", e)
+
+    async with async_session() as session:
+        await session.execute(
+            insert(RenewalQueue.__table__)
+            .values(subscription_id=subscription_id, due_at=due_at)
+            .on_conflict_do_update(
+                index_elements=["subscription_id"], set_={"due_at": due_at}
+            )
+        )
+        await session.commit()
+
+
+async def cancel_renewal(subscription_id: int):
+    """
+    Drop a cancelled subscription from the queue. Best effort: billing
+    skips subscriptions that are no longer active anyway.
+    """
+    try:
+        await get_async_redis().zrem(RENEWAL_QUEUE_KEY, str(subscription_id))
+    except RedisError as e:
+        logger.warning("Renewal queue unavailable: %s", e)
+
+
+async def _pop_due(now: datetime, limit: int) -> list[int]:
+    ids = await get_async_redis().eval(
+        _POP_DUE_SCRIPT, 1, RENEWAL_QUEUE_KEY, now.timestamp(), limit
+    )
+    return [int(subscription_id) for subscription_id in ids]
+
+
+async def _requeue(subscription_ids: list[int], due_at: datetime):
+    await get_async_redis().zadd(
+        RENEWAL_QUEUE_KEY,
+        {str(subscription_id): due_at.timestamp() for subscription_id in subscription_ids},
+    )
+
+
+async def _process_queue(now: datetime, today: date, batch_size: int) -> int:
+    processed = 0
+    while True:
+        try:
+            subscription_ids = await _pop_due(now, batch_size)
+        except RedisError as e:
+            logger.warning("Renewal queue unavailable: %s", e)
+            break
+        if not subscription_ids:
+            break
+
+        try:
+            async with async_session() as session:
+                processed += await bill_subscriptions(session, subscription_ids, today)
+        except Exception:
+            # Put the batch back so the next tick retries it.
+            await _requeue(subscription_ids, now)
+            raise
+    return processed
+
+
+async def _process_fallback(now: datetime, today: date, batch_size: int) -> int:
+    processed = 0
+    while True:
+        async with async_session() as session:
+            # Claiming and billing share a transaction, so a failed batch
+            # stays queued.
+            due = (
+                select(RenewalQueue.id)
+                .where(RenewalQueue.due_at <= now)
+                .order_by(RenewalQueue.due_at)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            subscription_ids = (
+                await session.execute(
+                    delete(RenewalQueue)
+                    .where(RenewalQueue.id.in_(due.scalar_subquery()))
+                    .returning(RenewalQueue.subscription_id)
+                )
+            ).scalars().all()
+            if not subscription_ids:
+                break
+            processed += await bill_subscriptions(session, subscription_ids, today)
+    return processed
+
+
+async def process_due_renewals(batch_size: int) -> int:
+    """
+    Bill every queued subscription whose due time has passed, from Redis
+    first and then from the fallback table. Work is proportional to the
+    renewals due, not to the size of the subscription table.
+
+    :return: number of invoices generated
+    """
+    now = datetime.now(timezone.utc)
+    today = billing_today()
+    processed = await _process_queue(now, today, batch_size)
+    processed += await _process_fallback(now, today, batch_size)
+    return processed
@@ -1,14 +1,24 @@
+import asyncio
+import json
+import logging
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
 from argon2 import PasswordHasher
 from fastapi import Depends
 from fastapi.security import OAuth2PasswordBearer
 from jwt import PyJWTError
+from redis.exceptions import RedisError
 
 from app.core import exceptions
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.redis_client import get_async_redis
 from app.core.token import decode_jwt
 from app.db import async_session
 from app.models import User
 
+logger = logging.getLogger(__name__)
 
 RESET_PASSWORD_TOKEN_AUDIENCE = "user:reset"
 VERIFY_USER_TOKEN_AUDIENCE = "user:verify"
@@ -23,6 +33,31 @@ ph: PasswordHasher = PasswordHasher(
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
+@dataclass(frozen=True)
+class CurrentUser:
+    """
+    Authenticated principal resolved from the access token.
+    """
+    id: int
+    username: str
+    email: str
+    is_active: bool
+
+
+_principal_cache = TTLCache(
+    maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL
+)
+# user id -> username of the cached principals, so row-change events
+# (which carry the id) can find the entry to drop.
+_principal_usernames = TTLCache(
+    maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL
+)
+
+
+def _principal_cache_key(username: str) -> str:
+    return f"auth:user:{username}"
+
+
 def verify_password(plain_password, hashed_password):
     """
     Compare the input password with the stored and hashed password.
@@ -40,16 +75,157 @@ def get_hashed_password(password):
     return ph.hash(password)
 
 
-async def get_current_user(token: str = Depends(oauth2_scheme)):
+def password_needs_rehash(hashed_password) -> bool:
     """
-    Decode the token and validate the user
+    True when the stored hash was made with other ARGON2_* parameters.
+    """
+    return ph.check_needs_rehash(hashed_password)
+
+
+_hash_executor: Executor | None = None
+_hash_inflight = 0
+
+
+def _get_hash_executor() -> Executor:
+    global _hash_executor
+    if _hash_executor is None:
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            _hash_executor = ProcessPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS
+            )
+        else:
+            _hash_executor = ThreadPoolExecutor(
+                max_workers=settings.PASSWORD_HASH_WORKERS,
+                thread_name_prefix="argon2",
+            )
+    return _hash_executor
+
+
+def shutdown_hash_executor():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True)
+        _hash_executor = None
+
+
+async def _run_hashing(fn, *args):
     """
+    Run an Argon2 call on the hashing pool so it never blocks the event
+    loop. Once every worker is busy and the queue is full the request is
+    rejected with 429 instead of piling up behind the pool.
+    """
+    global _hash_inflight
+    capacity = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE
+    if _hash_inflight >= capacity:
+        raise exceptions.TooManyRequests()
+
+    _hash_inflight += 1
     try:
-        payload = decode_jwt(
-            token,
-            secret=settings.SECRET_KEY,
-            audience=[LOGIN_VERIFICATION_AUDIENCE]
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_hash_executor(), fn, *args)
+    finally:
+        _hash_inflight -= 1
+
+
+async def verify_password_async(plain_password, hashed_password):
+    return await _run_hashing(verify_password, plain_password, hashed_password)
+
+
+async def get_hashed_password_async(password):
+    return await _run_hashing(get_hashed_password, password)
+
+
+async def _load_principal(username: str) -> CurrentUser | None:
+    """
+    Resolve the principal for `username` from the local cache, then the
+    shared Redis tier (when enabled), and only then from the database.
+    """
+    principal = _principal_cache.get(username)
+    if principal is not None:
+        return principal
+
+    redis_key = _principal_cache_key(username)
+    if settings.AUTH_CACHE_REDIS:
+        try:
+            cached = await get_async_redis().get(redis_key)
+        except RedisError as e:
+            logger.warning("Auth cache unavailable: %s", e)
+            cached = None
+        if cached is not None:
+            principal = CurrentUser(**json.loads(cached))
+            _cache_principal(principal)
+            return principal
+
+    async with async_session() as session:
+        user: User | None = await User.get_by_username(
+            session=session, username=username
         )
+    if user is None:
+        return None
+
+    principal = CurrentUser(
+        id=user.id,
+        username=user.username,
+        email=user.email,
+        is_active=user.is_active,
+    )
+    _cache_principal(principal)
+    if settings.AUTH_CACHE_REDIS:
+        try:
+            await get_async_redis().set(
+                redis_key, json.dumps(asdict(principal)), ex=settings.AUTH_CACHE_TTL
+            )
+        except RedisError as e:
+            logger.warning("Auth cache unavailable: %s", e)
+    return principal
+
+
+def _cache_principal(principal: CurrentUser):
+    _principal_cache.set(principal.username, principal)
+    _principal_usernames.set(principal.id, principal.username)
+
+
+async def invalidate_user(username: str):
+    """
+    Drop the cached principal for `username`; call after any change to
+    the user's credentials or active state. Other processes drop their
+    copy when the user row's change event reaches them (on_user_change).
+    """
+    _principal_cache.pop(username)
+    if settings.AUTH_CACHE_REDIS:
+        try:
+            await get_async_redis().delete(_principal_cache_key(username))
+        except RedisError as e:
+            logger.warning("Auth cache unavailable: %s", e)
+
+
+async def on_user_change(events):
+    """
+    Event bus subscriber: drop the cached principals, in this process and
+    in the shared Redis tier, of every user row changed by any writer.
+    """
+    usernames = []
+    for event in events:
+        username = _principal_usernames.get(event.id)
+        if username is not None:
+            _principal_cache.pop(username)
+            _principal_usernames.pop(event.id)
+            usernames.append(username)
+    if usernames and settings.AUTH_CACHE_REDIS:
+        try:
+            await get_async_redis().delete(
+                *(_principal_cache_key(username) for username in usernames)
+            )
+        except RedisError as e:
+            logger.warning("Auth cache unavailable: %s", e)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme)) -> CurrentUser:
+    """
+    Decode the token and validate the user
+    """
+    try:
+        payload = decode_jwt(token, audience=[LOGIN_VERIFICATION_AUDIENCE])
     except PyJWTError:
         raise exceptions.InvalidToken()
 
@@ -57,11 +233,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     if username is None:
         raise exceptions.NotAuthorized()
 
-    async with async_session() as session:
-        user: User | None = await User.get_by_username(
-            session=session, username=username
-        )
-
+    user = await _load_principal(username)
     if user is None:
         raise exceptions.NotAuthorized()
-    return user
\ No newline at end of file
+    return user
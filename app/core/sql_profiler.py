@@ -0,0 +1,135 @@
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from sqlalchemy import event
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = b"x-sql-profile"
+
+
+@dataclass
+class StatementProfile:
+    statement: str
+    parameters: str
+    duration_ms: float
+    rowcount: int
+
+
+# Statements recorded for the request being profiled, None when off
+_profile: ContextVar[list[StatementProfile] | None] = ContextVar(
+    "sql_profile", default=None
+)
+
+
+def _parameter_shape(parameters, executemany: bool) -> str:
+    """
+    Describe bound parameters without their values, e.g. "3x(int, str)".
+    """
+    if executemany and parameters:
+        return f"{len(parameters)}x{_parameter_shape(parameters[0], False)}"
+    if isinstance(parameters, dict):
+        return "(" + ", ".join(
+            f"{key}: {type(value).__name__}" for key, value in parameters.items()
+        ) + ")"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(value).__name__ for value in parameters) + ")"
+    return type(parameters).__name__
+
+
+def instrument_profiler(engine, name: str):
+    """
+    Record statements for profiled requests and log any statement slower
+    than SQL_SLOW_QUERY_MS on this engine.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("profiler_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        duration_ms = (time.perf_counter() - conn.info["profiler_start"].pop()) * 1000
+        profile = _profile.get()
+        slow = duration_ms >= settings.SQL_SLOW_QUERY_MS
+        if profile is None and not slow:
+            return
+
+        record = StatementProfile(
+            statement=statement,
+            parameters=_parameter_shape(parameters, executemany),
+            duration_ms=round(duration_ms, 3),
+            rowcount=cursor.rowcount,
+        )
+        if profile is not None:
+            profile.append(record)
+        if slow:
+            logger.warning(
+                "Slow query",
+                extra={
+                    "engine": name,
+                    "statement": record.statement,
+                    "parameters": record.parameters,
+                    "duration_ms": record.duration_ms,
+                    "rowcount": record.rowcount,
+                },
+            )
+
+
+def _server_timing(profile: list[StatementProfile]) -> bytes:
+    total = sum(record.duration_ms for record in profile)
+    return f'sql;dur={total:.3f};desc="{len(profile)} statements"'.encode()
+
+
+class SqlProfilerMiddleware:
+    """
+    Pure ASGI middleware profiling a request's SQL when SQL_PROFILING is
+    "always", or "header" and the request sends `X-SQL-Profile: 1`.
+    Adds a Server-Timing header and logs requests whose SQL time exceeds
+    SQL_SLOW_REQUEST_MS.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    def _enabled(self, scope) -> bool:
+        if settings.SQL_PROFILING == "always":
+            return True
+        if settings.SQL_PROFILING == "header":
+            return dict(scope["headers"]).get(PROFILE_HEADER) == b"1"
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._enabled(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile: list[StatementProfile] = []
+        token = _profile.set(profile)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"server-timing", _server_timing(profile)),
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _profile.reset(token)
+            total_ms = sum(record.duration_ms for record in profile)
+            if total_ms >= settings.SQL_SLOW_REQUEST_MS:
+                logger.warning(
+                    "Slow request SQL",
+                    extra={
+                        "path": scope["path"],
+                        "sql_ms": round(total_ms, 3),
+                        "statements": [record.__dict__ for record in profile],
+                    },
+                )
@@ -1,9 +1,13 @@
+import json
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import jwt
+from jwt.algorithms import get_default_algorithms
 from pydantic import SecretStr
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 SecretType = str | SecretStr
@@ -15,31 +19,105 @@ def _get_secret_value(secret: SecretType) -> str:
     return secret
 
 
+class TokenService:
+    """
+    Signs and verifies JWTs with keys prepared once up front.
+
+    Tokens carry a `kid` header naming the signing key; verification
+    accepts the current key plus any retired keys still listed in
+    JWT_VERIFICATION_KEYS, so keys can be rotated without logging
+    everybody out. Verified claims are cached until the token expires,
+    so a bearer token presented again skips signature verification.
+    """
+
+    def __init__(
+        self,
+        algorithm: str,
+        signing_key: SecretType,
+        key_id: str,
+        verification_keys: dict[str, dict] | None = None,
+        claims_cache_size: int = 10000,
+    ):
+        algorithms = get_default_algorithms()
+        self.algorithm = algorithm
+        self.key_id = key_id
+        self._signing_key = algorithms[algorithm].prepare_key(
+            _get_secret_value(signing_key)
+        )
+        self._verification_keys: dict[str, tuple[str, Any]] = {
+            key_id: (algorithm, self._public_key(self._signing_key))
+        }
+        for kid, entry in (verification_keys or {}).items():
+            self._verification_keys[kid] = (
+                entry["algorithm"],
+                algorithms[entry["algorithm"]].prepare_key(entry["key"]),
+            )
+        self._claims = TTLCache(maxsize=claims_cache_size, ttl=0)
+
+    @staticmethod
+    def _public_key(key):
+        # Asymmetric private keys verify with their public half; HMAC
+        # secrets are used as-is.
+        return key.public_key() if hasattr(key, "public_key") else key
+
+    @classmethod
+    def from_settings(cls) -> "TokenService":
+        return cls(
+            algorithm=settings.JWT_ALGORITHM,
+            signing_key=settings.JWT_SIGNING_KEY or settings.SECRET_KEY,
+            key_id=settings.JWT_KEY_ID,
+            verification_keys=json.loads(settings.JWT_VERIFICATION_KEYS or "{}"),
+            claims_cache_size=settings.JWT_CLAIMS_CACHE_SIZE,
+        )
+
+    def encode(self, data: dict, lifetime_seconds: int | None) -> str:
+        payload = data.copy()
+        if lifetime_seconds:
+            payload["exp"] = datetime.now(tz=timezone.utc) + timedelta(
+                seconds=lifetime_seconds
+            )
+        return jwt.encode(
+            payload,
+            self._signing_key,
+            algorithm=self.algorithm,
+            headers={"kid": self.key_id},
+        )
+
+    def decode(self, encoded_jwt: str, audience: list[str]) -> dict[str, Any]:
+        claims = self._claims.get(encoded_jwt)
+        if claims is not None:
+            aud = claims.get("aud")
+            if not set(aud if isinstance(aud, list) else [aud]) & set(audience):
+                raise jwt.InvalidAudienceError("Invalid audience")
+            return claims
+
+        kid = jwt.get_unverified_header(encoded_jwt).get("kid", self.key_id)
+        try:
+            algorithm, key = self._verification_keys[kid]
+        except KeyError:
+            raise jwt.InvalidKeyError(f"Unknown key id {kid!r}")
+
+        claims = jwt.decode(
+            encoded_jwt, key, algorithms=[algorithm], audience=audience
+        )
+        expires_at = claims.get("exp")
+        if expires_at is not None:
+            self._claims.set(encoded_jwt, claims, ttl=expires_at - time.time())
+        return claims
+
+
+token_service = TokenService.from_settings()
+
+
 def generate_jwt(
         data: dict,
-        secret: SecretType,
-        lifetime_seconds: int = settings.ACCESS_TOKEN_EXPIRE_MINUTES,
-        algorithm: str = settings.HASHING_ALGORITHM,
+        lifetime_seconds: int = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
 ) -> str:
-    payload = data.copy()
-    if lifetime_seconds:
-        expire = datetime.now(tz=timezone.utc) + timedelta(
-            seconds=lifetime_seconds)
-        payload["exp"] = expire
-    return jwt.encode(payload, _get_secret_value(secret), algorithm=algorithm)
+    return token_service.encode(data, lifetime_seconds)
 
 
 def decode_jwt(
         encoded_jwt: str,
-        secret: SecretType,
         audience: list[str],
-        algorithms=None,
 ) -> dict[str, Any]:
-    if algorithms is None:
-        algorithms = [settings.HASHING_ALGORITHM]
-    return jwt.decode(
-        encoded_jwt,
-        _get_secret_value(secret),
-        audience=audience,
-        algorithms=algorithms,
-    )
+    return token_service.decode(encoded_jwt, audience)
@@ -0,0 +1,35 @@
+import asyncio
+from typing import Awaitable, TypeVar
+
+T = TypeVar("T")
+
+# One event loop per worker process, kept open between tasks. asyncpg
+# connections (and the async Redis client) are bound to the loop that
+# opened them, so a fresh asyncio.run() per task could not reuse the
+# async engine's pool.
+_loop: asyncio.AbstractEventLoop | None = None
+
+
+def get_worker_loop() -> asyncio.AbstractEventLoop:
+    global _loop
+    if _loop is None or _loop.is_closed():
+        _loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(_loop)
+    return _loop
+
+
+def run_async(awaitable: Awaitable[T]) -> T:
+    """
+    Run `awaitable` to completion on this process's persistent loop.
+    For synchronous callers such as Celery tasks; never call it from
+    code already running on an event loop.
+    """
+    return get_worker_loop().run_until_complete(awaitable)
+
+
+def close_worker_loop():
+    global _loop
+    if _loop is not None and not _loop.is_closed():
+        _loop.run_until_complete(_loop.shutdown_asyncgens())
+        _loop.close()
+    _loop = None
@@ -1,45 +1,157 @@
-from app.models import Subscription, Invoice
-from app.sync_db import get_sync_db
-from datetime import date, timedelta
-from celery import shared_task
-from sqlalchemy import func
+import logging
+
+from app.core import config
+from app.core.billing import (
+    billing_today,
+    finish_billing_run,
+    generate_invoice_range,
+    start_billing_run,
+)
+from app.core.lock import acquire_lock, release_lock
+from app.core.partitions import maintain_invoice_partitions
+from app.core.redis_client import get_redis
+from app.core.renewals import process_due_renewals
+from app.core.worker_loop import run_async
+from app.utils.enums import BillingRunStatus
+from datetime import date
+from uuid import uuid4
+from celery import chord, shared_task
+
+logger = logging.getLogger(__name__)
 
 
 @shared_task
-def check_active_sub_and_generate_invoice():
+def bill_due_renewals():
     """
-    Cron job: Check active subscriptions that end today,
-    generate an invoice, and store it in the invoice table.
+    Cron job: bill the subscriptions whose renewal has fallen due since
+    the last tick, popped from the renewal queue.
     """
-    today = date.today()
-    print("Today's date:", today)
+    processed = run_async(
+        process_due_renewals(batch_size=config.settings.RENEWAL_BATCH_SIZE)
+    )
+    if processed:
+        logger.info("Due renewals: %s invoices generated", processed)
+    return processed
 
-    with get_sync_db() as db:
-        # Get subscriptions that are active and end today
-        subscriptions = (
-            db.query(Subscription)
-            .filter(Subscription.status == "active", func.date(Subscription.end_date) == today)
-            .all()
+
+@shared_task
+def maintain_invoice_partitions_task():
+    """
+    Cron job: pre-create the upcoming monthly invoice partitions and
+    archive the ones past the retention window.
+    """
+    return run_async(
+        maintain_invoice_partitions(
+            billing_today(),
+            months_ahead=config.settings.INVOICE_PARTITIONS_AHEAD,
+            retention_months=config.settings.INVOICE_PARTITION_RETENTION_MONTHS,
         )
-        print("Active subscriptions ending today:", len(subscriptions))
-        
-
-        for sub in subscriptions:
-            
-            print("subcription:", sub.end_date.date() , sub.end_date, sub.id)
-            # Generate invoice
-            invoice = Invoice(
-                user_id=sub.user_id,
-                subscription_id=sub.id,
-                amount=sub.plan.price,
-                issue_date=today,
-                due_date=today + timedelta(days=7),  # e.g., due in 7 days
-                status="unpaid",
-            )
+    )
+
 
-            db.add(invoice)
+@shared_task
+def generate_invoice_shard(today: str, start_id: int, end_id: int):
+    """
+    Generate the invoices for one subscription id range of a billing run.
+    """
+    processed = run_async(
+        generate_invoice_range(
+            date.fromisoformat(today),
+            batch_size=config.settings.INVOICE_BATCH_SIZE,
+            start_id=start_id,
+            end_id=end_id,
+        )
+    )
+    logger.info("Shard %s-%s: %s invoices generated", start_id, end_id, processed)
+    return processed
+
+
+def _billing_lock_name(today: str) -> str:
+    return f"billing-run:{today}"
+
+
+@shared_task
+def summarize_billing_run(results, today: str, run_id: int, lock_token: str):
+    """
+    Chord callback: aggregate the per-shard invoice counts of a billing run,
+    close its ledger entry and release the run lock.
+    """
+    total = sum(results)
+    run_async(finish_billing_run(run_id, BillingRunStatus.COMPLETED, invoices=total))
+    release_lock(get_redis(), _billing_lock_name(today), lock_token)
+    logger.info(
+        "Billing run %s: %s invoices across %s shards", today, total, len(results)
+    )
+    return {"date": today, "shards": len(results), "invoices": total}
+
+
+@shared_task
+def fail_billing_run(request, exc, traceback, today: str, run_id: int, lock_token: str):
+    """
+    Chord error callback: mark the ledger entry failed and release the lock
+    so the next scheduled run can pick up the remaining subscriptions.
+    """
+    run_async(finish_billing_run(run_id, BillingRunStatus.FAILED))
+    release_lock(get_redis(), _billing_lock_name(today), lock_token)
+    logger.error("Billing run %s failed: %s", today, exc)
+
+
+@shared_task
+def check_active_sub_and_generate_invoice():
+    """
+    Cron job: Check active subscriptions that end today, split them
+    into id-range shards and fan the invoice generation out to the
+    workers, reporting the totals once every shard has finished.
+    Runs once a day as a sweep for anything the renewal queue missed,
+    e.g. subscriptions created before the queue existed.
+    Only one run per day is in flight at a time; overlapping beats
+    skip while the run lock is held.
+    """
+    today = billing_today()
+    logger.info("Billing run for %s", today)
+
+    redis = get_redis()
+    lock_name = _billing_lock_name(today.isoformat())
+    lock_token = uuid4().hex
+    if not acquire_lock(
+        redis, lock_name, lock_token, config.settings.BILLING_LOCK_TIMEOUT
+    ):
+        logger.info("Billing run already in progress, skipping")
+        return 0
+
+    try:
+        run_id, shards = run_async(
+            start_billing_run(
+                today,
+                shard_size=config.settings.BILLING_SHARD_SIZE,
+                max_shards=config.settings.BILLING_MAX_PARALLELISM,
+            )
+        )
+    except Exception:
+        release_lock(redis, lock_name, lock_token)
+        raise
 
-            # Optionally, update subscription status to expired
-            sub.status = "expired"
+    logger.info("Billing shards for subscriptions ending today: %s", len(shards))
+    if not shards:
+        run_async(finish_billing_run(run_id, BillingRunStatus.COMPLETED))
+        release_lock(redis, lock_name, lock_token)
+        return 0
 
-        db.commit()
+    callback = summarize_billing_run.s(today.isoformat(), run_id, lock_token)
+    callback.on_error(
+        fail_billing_run.s(today.isoformat(), run_id, lock_token)
+    )
+    try:
+        chord(
+            [
+                generate_invoice_shard.s(today.isoformat(), start_id, end_id)
+                for start_id, end_id in shards
+            ]
+        )(callback)
+    except Exception:
+        # Nothing was dispatched (e.g. the broker is down): close the
+        # ledger entry and free the lock instead of waiting for it to expire.
+        run_async(finish_billing_run(run_id, BillingRunStatus.FAILED))
+        release_lock(redis, lock_name, lock_token)
+        raise
+    return len(shards)
@@ -1,13 +1,21 @@
+import logging
+import asyncio
 from typing import AsyncGenerator
 
 from alembic import command
 from alembic.config import Config
 from alembic.runtime.environment import EnvironmentContext
 from alembic.script import ScriptDirectory
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm.session import sessionmaker
 
 from app.core import config as app_config
+from app.core.metrics import instrument_engine
+from app.core.pool import engine_options, instrument_pool
+from app.core.sql_profiler import instrument_profiler
+
+logger = logging.getLogger(__name__)
 
 
 def _alembic_get_current_rev(config, script):
@@ -37,8 +45,8 @@ def init_db():
     Check for the revision and apply the
     migrations accordingly
     """
-    print("Initializing DB")
-    print("Checking for database migrations")
+    logger.info("Initializing DB")
+    logger.info("Checking for database migrations")
 
     alembic_config = Config("alembic.ini")
     alembic_config.attributes["configure_logger"] = False
@@ -47,27 +55,48 @@ def init_db():
     curr_rev = _alembic_get_current_rev(alembic_config, script)
     head_rev = script.get_revision("head").revision
 
-    print(f"Head Rev: {head_rev}, Current Rev: {curr_rev}")
+    logger.info("Head Rev: %s, Current Rev: %s", head_rev, curr_rev)
     if curr_rev != head_rev or curr_rev is None:
-        print(
-            f"Alembic head is {head_rev} but this DB is at {curr_rev}; running migrations"
+        logger.info(
+            "Alembic head is %s but this DB is at %s; running migrations",
+            head_rev,
+            curr_rev,
         )
         command.upgrade(alembic_config, "head")
-        print("Migrations complete")
+        logger.info("Migrations complete")
     else:
-        print("No migrations are required")
-    print("Done initializing DB")
+        logger.info("No migrations are required")
+    logger.info("Done initializing DB")
 
 
-async_engine = create_async_engine(app_config.settings.DATABASE_URI, pool_pre_ping=True)
+async_engine = create_async_engine(
+    app_config.settings.DATABASE_URI, **engine_options(is_async=True)
+)
+instrument_pool(async_engine.sync_engine)
+instrument_engine(async_engine.sync_engine, "async")
+instrument_profiler(async_engine.sync_engine, "async")
 async_session = sessionmaker(async_engine, expire_on_commit=False, class_=AsyncSession)
 
 
+async def warm_up_pool():
+    """
+    Open the pool's steady-state connections up front so the first
+    requests after a (re)start don't pay for connection setup.
+    """
+    if app_config.settings.DB_PGBOUNCER:
+        return
+
+    async def _touch():
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    await asyncio.gather(
+        *(_touch() for _ in range(app_config.settings.DB_POOL_SIZE))
+    )
+    logger.info("Warmed %s database connections", app_config.settings.DB_POOL_SIZE)
+
+
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
     async with async_session() as session:
         yield session
 
-
-async def listen_to_notifications():
-    async with async_engine.begin() as conn:
-        await conn.run_sync(listen_to_notifications)
@@ -0,0 +1,154 @@
+"""
+Seed a representative dataset and EXPLAIN the route-layer queries,
+flagging every one whose plan falls back to a sequential scan. The seed
+is rolled back afterwards.
+
+    python -m app.index_advisor --seed-users 20000
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from datetime import date, timedelta
+
+from sqlalchemy import select, text
+from sqlalchemy.dialects import postgresql
+
+from app.core.billing import expiring_subscriptions_filter, billing_today
+from app.core.config import settings
+from app.core.partitions import create_invoice_partitions
+from app.db import async_engine
+from app.models import Invoice, Subscription
+from app.utils.enums import InvoiceStatus, SubscriptionStatus
+
+SEED_PREFIX = "advisor_"
+
+SEED_STATEMENTS = [
+    """
+    INSERT INTO "user" (first_name, last_name, username, email, password, is_active, created_on)
+    SELECT 'Advisor', 'User', :prefix || g, :prefix || g || '@example.com', 'x', true, now()
+    FROM generate_series(1, :users) AS g
+    ON CONFLICT DO NOTHING
+    """,
+    """
+    INSERT INTO subscription (user_id, plan_id, start_date, end_date, due_at, status)
+    SELECT u.id,
+           (SELECT min(id) FROM plan),
+           now() - (g * interval '30 days'),
+           now() - ((g - 1) * interval '30 days'),
+           now() - ((g - 1) * interval '30 days'),
+           CASE WHEN g = 1 THEN 'active' ELSE 'expired' END
+    FROM "user" u, generate_series(1, :history) AS g
+    WHERE u.username LIKE :prefix || '%'
+    """,
+    """
+    INSERT INTO invoice (user_id, subscription_id, amount, issue_date, due_date, status)
+    SELECT s.user_id, s.id, 100, s.end_date::date, s.end_date::date + 7,
+           CASE WHEN s.status = 'expired' THEN 'paid' ELSE 'unpaid' END
+    FROM subscription s
+    JOIN "user" u ON u.id = s.user_id
+    WHERE u.username LIKE :prefix || '%'
+    ON CONFLICT DO NOTHING
+    """,
+    "ANALYZE",
+]
+
+
+def route_queries(user_id: int, subscription_id: int, started: date) -> dict:
+    """
+    The lookups issued by app/routes/plan.py and the billing cron.
+    """
+    return {
+        "subscription by user and status": select(Subscription).where(
+            Subscription.user_id == user_id,
+            Subscription.status == SubscriptionStatus.ACTIVE.value,
+        ),
+        "invoice by subscription": select(Invoice).where(
+            Invoice.subscription_id == subscription_id,
+            Invoice.issue_date >= started,
+        ),
+        "unpaid invoice by subscription": select(Invoice).where(
+            Invoice.subscription_id == subscription_id,
+            Invoice.status == InvoiceStatus.unpaid.value,
+            Invoice.issue_date >= started,
+        ),
+        "expiring subscriptions": select(Subscription.id).where(
+            *expiring_subscriptions_filter(billing_today())
+        ),
+    }
+
+
+def _seq_scans(plan: dict) -> list[str]:
+    scans = []
+    if plan.get("Node Type") == "Seq Scan":
+        scans.append(plan.get("Relation Name"))
+    for child in plan.get("Plans", []):
+        scans.extend(_seq_scans(child))
+    return scans
+
+
+async def _advise(conn, seed_users: int, history: int) -> int:
+    if seed_users:
+        await create_invoice_partitions(
+            conn,
+            date.today(),
+            settings.INVOICE_PARTITIONS_AHEAD,
+            since=date.today() - timedelta(days=30 * history),
+        )
+        for statement in SEED_STATEMENTS:
+            await conn.execute(
+                text(statement),
+                {"prefix": SEED_PREFIX, "users": seed_users, "history": history},
+            )
+
+    sample = (
+        await conn.execute(
+            select(Subscription.user_id, Subscription.id, Subscription.start_date)
+            .order_by(Subscription.id.desc())
+            .limit(1)
+        )
+    ).first()
+    if sample is None:
+        print("No subscriptions found; run with --seed-users")
+        return 1
+
+    flagged = 0
+    queries = route_queries(sample.user_id, sample.id, sample.start_date.date())
+    for name, query in queries.items():
+        sql = query.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+        result = await conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"))
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        scans = _seq_scans(plan[0]["Plan"])
+        if scans:
+            flagged += 1
+            print(f"SEQ SCAN  {name}: {', '.join(scans)}")
+        else:
+            print(f"ok        {name}")
+    return 1 if flagged else 0
+
+
+async def main(seed_users: int, history: int) -> int:
+    # The seed data (active subscriptions due today included) only lives
+    # in this transaction, which is always rolled back, so it can never
+    # reach the billing runs of the database being inspected.
+    try:
+        async with async_engine.connect() as conn:
+            transaction = await conn.begin()
+            try:
+                return await _advise(conn, seed_users, history)
+            finally:
+                await transaction.rollback()
+    finally:
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed-users", type=int, default=0)
+    parser.add_argument("--history", type=int, default=12)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.seed_users, args.history)))
@@ -3,11 +3,16 @@ This script is executed before the application startup.
 """
 
 import asyncio
+import logging
 from app.core import config
+from app.core.log import setup_logging
+from app.core.plan_catalog import bump_plan_catalog_version
 from app.db import async_session
 from app.models import Plan
 from app.utils import PlanEnum
 
+logger = logging.getLogger(__name__)
+
 
 async def main() -> None:
 
@@ -19,6 +24,7 @@ async def main() -> None:
                 PlanEnum.PRO.value: 199,
                 PlanEnum.ENTERPRISE.value: 299,
             }
+            created = False
             for plan in [
                 PlanEnum.BASIC.value,
                 PlanEnum.PRO.value,
@@ -33,13 +39,17 @@ async def main() -> None:
                     )
                     session.add(new_plan)
                     await session.commit()
-                    print(f"{plan} plan created successfully.")
+                    created = True
+                    logger.info("%s plan created successfully.", plan)
                 else:
-                    print(f"{plan} plan already exists.")
+                    logger.info("%s plan already exists.", plan)
+            if created:
+                bump_plan_catalog_version()
         except Exception as e:
-            print(f"Exception while adding initial data to the db: {str(e)}")
+            logger.exception("Exception while adding initial data to the db: %s", e)
 
 
 if __name__ == "__main__":
+    setup_logging()
     # Run the main function asynchronously
     asyncio.run(main())
@@ -1,19 +1,68 @@
-from contextlib import asynccontextmanager
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from redis.exceptions import RedisError
+from app.core.events import event_bus
+from app.core.log import CorrelationIdMiddleware, setup_logging
+from app.core.metrics import PrometheusMiddleware, render_metrics
+from app.core.pool import pool_status
+from app.core.plan_catalog import (
+    load_plan_catalog,
+    on_plan_change,
+    run_plan_catalog_refresher,
+)
+from app.core.read_cache import on_billing_rows_change
+from app.core.rehash import drain_rehashes, run_rehash_flusher
+from app.core.security import on_user_change, shutdown_hash_executor
+from app.core.sql_profiler import SqlProfilerMiddleware
+from app.core.redis_client import get_async_redis
+from app.db import async_engine, async_session, warm_up_pool
 from app.routes import auth, plan
 
 
+setup_logging()
+logger = logging.getLogger(__name__)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await warm_up_pool()
+    try:
+        await get_async_redis().ping()
+    except RedisError as e:
+        logger.warning("Redis unavailable at startup: %s", e)
+    async with async_session() as session:
+        await load_plan_catalog(session)
+    event_bus.subscribe("plan", on_plan_change)
+    event_bus.subscribe("subscription", on_billing_rows_change)
+    event_bus.subscribe("invoice", on_billing_rows_change)
+    event_bus.subscribe("user", on_user_change)
+    await event_bus.start()
+    background_tasks = [
+        asyncio.create_task(run_rehash_flusher()),
+        asyncio.create_task(run_plan_catalog_refresher()),
+    ]
     yield
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+    await event_bus.stop()
+    await drain_rehashes()
+    shutdown_hash_executor()
+    await get_async_redis().aclose()
+    await async_engine.dispose()
 
 
 app = FastAPI(
     title="AppKnox Billing System",
     openapi_url="/openapi.json",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.add_middleware(
@@ -23,6 +72,9 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(SqlProfilerMiddleware)
+app.add_middleware(PrometheusMiddleware)
+app.add_middleware(CorrelationIdMiddleware)
 
 
 @app.get("/")
@@ -30,5 +82,19 @@ async def welcome():
     return "welcome to appknox billing system"
 
 
+@app.get("/health", include_in_schema=False)
+async def health():
+    """
+    Liveness plus this process's database pool occupancy and wait totals.
+    """
+    return {"status": "ok", "db_pool": pool_status(async_engine.sync_engine)}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    content, content_type = render_metrics()
+    return Response(content=content, media_type=content_type)
+
+
 app.include_router(auth.auth_router, prefix="/api/v1", tags=["auth"])
 app.include_router(plan.router, prefix="/api/v1", tags=["Subscription"])
\ No newline at end of file
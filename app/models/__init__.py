@@ -1,3 +1,4 @@
 from .base import Base, TimestampMixin
 from .plan import Plan, Subscription, Invoice
-from .user import User
\ No newline at end of file
+from .user import User
+from .billing import BillingRun, RenewalQueue
@@ -1,13 +1,22 @@
+import base64
+import json
+import logging
+from collections import defaultdict
 from datetime import datetime, timezone
+from typing import AsyncIterator, Sequence
 
 from sqlalchemy import (
     DateTime,
     Integer,
+    column,
+    inspect,
     select,
     String,
 )
 from sqlalchemy import delete as sqlalchemy_delete
+from sqlalchemy import insert as sqlalchemy_insert
 from sqlalchemy import update as sqlalchemy_update
+from sqlalchemy import values as sqlalchemy_values
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import (
@@ -16,6 +25,11 @@ from sqlalchemy.orm import (
     mapped_column,
     Mapped,
 )
+from sqlalchemy.orm.interfaces import LoaderOption
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
 
 
 class Base(DeclarativeBase):
@@ -37,7 +51,37 @@ class TimestampMixin:
     )
 
 
+def _chunks(items: Sequence, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def encode_cursor(last_id: int) -> str:
+    """
+    Opaque keyset cursor pointing just past `last_id`.
+    """
+    return base64.urlsafe_b64encode(json.dumps({"id": last_id}).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    try:
+        return int(json.loads(base64.urlsafe_b64decode(cursor.encode()))["id"])
+    except Exception:
+        raise Exception("Invalid cursor")
+
+
 class CRUDMixin:
+    @classmethod
+    def _select(cls, load: Sequence[LoaderOption] | None = None):
+        """
+        SELECT for the model with the caller's relationship loader options,
+        e.g. `load=[selectinload(User.subscriptions)]`.
+        """
+        query = select(cls)
+        if load:
+            query = query.options(*load)
+        return query
+
     @classmethod
     async def create(cls, session: AsyncSession, **kwargs):
         db_entry: cls = cls(**kwargs)
@@ -46,10 +90,10 @@ class CRUDMixin:
             await session.flush()
             return db_entry
         except IntegrityError as ex:
-            print(f"Duplicate Data: {ex}")
+            logger.warning("Duplicate Data: %s", ex)
             raise Exception("Data already exists")
         except Exception as e:
-            print(f"Exception: {e}")
+            logger.exception("Exception: %s", e)
             raise Exception("Database error")
 
     @classmethod
@@ -65,12 +109,14 @@ class CRUDMixin:
             await session.commit()
         except Exception as e:
             await session.rollback()
-            print(f"Error while updating: {e}")
+            logger.exception("Error while updating: %s", e)
             raise Exception("Database error")
 
     @classmethod
-    async def get(cls, session: AsyncSession, id):
-        query = select(cls).where(cls.id == id)
+    async def get(
+        cls, session: AsyncSession, id, load: Sequence[LoaderOption] | None = None
+    ):
+        query = cls._select(load).where(cls.id == id)
         results = await session.execute(query)
         item = results.scalars().first()
         if item is None:
@@ -79,15 +125,60 @@ class CRUDMixin:
 
     @classmethod
     async def get_all(cls, session: AsyncSession, offset=None, limit=None):
-        if offset and limit is not None:
-            query = select(cls).offset(offset).limit(limit)
-        else:
-            query = select(cls)
+        query = select(cls)
+        if offset:
+            query = query.offset(offset)
+        if limit is not None:
+            query = query.limit(limit)
+        results = await session.execute(query)
+        return results.scalars().all()
+
+    @classmethod
+    async def get_page(
+        cls,
+        session: AsyncSession,
+        limit: int,
+        cursor: str | None = None,
+        where: Sequence = (),
+        load: Sequence[LoaderOption] | None = None,
+    ):
+        """
+        Keyset pagination ordered by id: seeks past the cursor instead of
+        scanning OFFSET rows.
+
+        :return: (items, next_cursor); next_cursor is None on the last page
+        """
+        query = cls._select(load).where(*where).order_by(cls.id).limit(limit + 1)
+        if cursor is not None:
+            query = query.where(cls.id > decode_cursor(cursor))
         results = await session.execute(query)
-        print(f"Results: {results}")
         items = results.scalars().all()
-        print(f"Items: {items}")
-        return items
+        if len(items) > limit:
+            return items[:limit], encode_cursor(items[limit - 1].id)
+        return items, None
+
+    @classmethod
+    async def stream(
+        cls,
+        session: AsyncSession,
+        batch_size: int = 1000,
+        where: Sequence = (),
+        load: Sequence[LoaderOption] | None = None,
+    ) -> AsyncIterator:
+        """
+        Yield rows ordered by id from a server-side cursor, fetching
+        `batch_size` rows at a time so the result is never materialized.
+        """
+        query = (
+            cls._select(load)
+            .where(*where)
+            .order_by(cls.id)
+            .execution_options(yield_per=batch_size)
+        )
+        results = await session.stream(query)
+        async for partition in results.scalars().partitions():
+            for item in partition:
+                yield item
 
     @classmethod
     async def delete(cls, session: AsyncSession, id):
@@ -98,5 +189,143 @@ class CRUDMixin:
             return True
         except Exception as e:
             await session.rollback()
-            print(f"Error while deleting: {e}")
+            logger.exception("Error while deleting: %s", e)
+            raise Exception("Database error")
+
+    @classmethod
+    async def bulk_create(
+        cls, session: AsyncSession, rows: Sequence[dict], chunk_size: int | None = None
+    ):
+        """
+        INSERT many rows with RETURNING, `chunk_size` rows per statement.
+        Like `create`, it flushes but leaves the commit to the caller.
+        """
+        chunk_size = chunk_size or settings.CRUD_BULK_CHUNK_SIZE
+        created = []
+        try:
+            for chunk in _chunks(list(rows), chunk_size):
+                results = await session.scalars(
+                    sqlalchemy_insert(cls).returning(cls), chunk
+                )
+                created.extend(results.all())
+            return created
+        except IntegrityError as ex:
+            logger.warning("Duplicate Data: %s", ex)
+            raise Exception("Data already exists")
+        except Exception as e:
+            logger.exception("Exception: %s", e)
+            raise Exception("Database error")
+
+    @classmethod
+    def _primary_key_names(cls) -> list[str]:
+        """
+        Attribute names of the primary key, id first.
+        """
+        mapper = inspect(cls)
+        names = [
+            mapper.get_property_by_column(key_column).key
+            for key_column in mapper.primary_key
+        ]
+        return sorted(names, key=lambda name: name != "id")
+
+    @classmethod
+    def _primary_key(cls, key) -> dict:
+        """
+        {attribute: value} for a primary key given as a scalar or, when the
+        model's key is composite, as a tuple in `_primary_key_names` order,
+        e.g. (id, issue_date) for Invoice.
+        """
+        names = cls._primary_key_names()
+        key = key if isinstance(key, tuple) else (key,)
+        if len(key) != len(names):
+            raise Exception(
+                f"{cls.__name__} rows are keyed by ({', '.join(names)})"
+            )
+        return dict(zip(names, key))
+
+    @classmethod
+    def _bulk_update_statement(cls, names: Sequence[str], rows: Sequence[dict]):
+        """
+        UPDATE ... FROM (VALUES ...) setting `names` on every row in `rows`,
+        returning the primary key of each row actually updated.
+        """
+        columns = inspect(cls).columns
+        keys = cls._primary_key_names()
+        data = sqlalchemy_values(
+            *(column(name, columns[name].type) for name in (*keys, *names)),
+            name="bulk_update",
+        ).data([tuple(row[name] for name in (*keys, *names)) for row in rows])
+        return (
+            sqlalchemy_update(cls.__table__)
+            .where(*(columns[key] == data.c[key] for key in keys))
+            .values({columns[name]: data.c[name] for name in names})
+            .returning(*(columns[key] for key in keys))
+        )
+
+    @classmethod
+    async def bulk_update(
+        cls,
+        session: AsyncSession,
+        values: dict[int | tuple, dict],
+        chunk_size: int | None = None,
+    ):
+        """
+        UPDATE many rows by primary key from a {key: {column: value}}
+        mapping and commit them in one transaction. Keys are ids, or
+        primary key tuples for a composite key (see `_primary_key`).
+        Each chunk of rows setting the same columns is one statement.
+        Primary key columns themselves cannot be changed this way.
+
+        :return: number of rows updated; keys matching no row don't count
+        """
+        chunk_size = chunk_size or settings.CRUD_BULK_CHUNK_SIZE
+        groups: dict[tuple, list[dict]] = defaultdict(list)
+        for key, row_values in values.items():
+            groups[tuple(sorted(row_values))].append(
+                {**row_values, **cls._primary_key(key)}
+            )
+        updated = 0
+        try:
+            for names, rows in groups.items():
+                for chunk in _chunks(rows, chunk_size):
+                    results = await session.execute(
+                        cls._bulk_update_statement(names, chunk)
+                    )
+                    updated += len(results.all())
+            await session.commit()
+            return updated
+        except IntegrityError as ex:
+            await session.rollback()
+            logger.warning("Duplicate Data: %s", ex)
+            raise Exception("Data already exists")
+        except Exception as e:
+            await session.rollback()
+            logger.exception("Error while updating: %s", e)
+            raise Exception("Database error")
+
+    @classmethod
+    async def bulk_delete(
+        cls, session: AsyncSession, ids: Sequence[int], chunk_size: int | None = None
+    ):
+        """
+        DELETE many rows by id and commit them in one transaction.
+
+        :return: ids that were actually deleted
+        """
+        chunk_size = chunk_size or settings.CRUD_BULK_CHUNK_SIZE
+        deleted = []
+        try:
+            for chunk in _chunks(list(ids), chunk_size):
+                results = await session.execute(
+                    sqlalchemy_delete(cls)
+                    .where(cls.id.in_(chunk))
+                    .returning(cls.id)
+                    .execution_options(synchronize_session=False)
+                )
+                deleted.extend(results.scalars().all())
+            await session.commit()
+            return deleted
+        except Exception as e:
+            await session.rollback()
+            logger.exception("Error while deleting: %s", e)
             raise Exception("Database error")
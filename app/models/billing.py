@@ -0,0 +1,33 @@
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, String
+from datetime import datetime, timezone
+from app.models.base import Base, CRUDMixin
+
+
+class BillingRun(Base, CRUDMixin):
+    __tablename__ = "billing_run"
+
+    billing_date = Column(Date, nullable=False)
+    status = Column(String, default="running", nullable=False)
+    shards = Column(Integer, default=0, nullable=False)
+    invoices = Column(Integer, default=0, nullable=False)
+    started_on = Column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+    finished_on = Column(DateTime(timezone=True), nullable=True)
+
+
+class RenewalQueue(Base, CRUDMixin):
+    """
+    Durable fallback for the Redis renewal due-queue: holds the
+    subscriptions that could not be enqueued while Redis was unavailable.
+    """
+
+    __tablename__ = "renewal_queue"
+
+    subscription_id = Column(
+        Integer,
+        ForeignKey("subscription.id", ondelete="CASCADE"),
+        unique=True,
+        nullable=False,
+    )
+    due_at = Column(DateTime(timezone=True), nullable=False, index=True)
@@ -3,30 +3,47 @@ from sqlalchemy import (
     String,
     Integer,
     ForeignKey,
-    select,
     DateTime,
     Numeric,
     Date,
+    UniqueConstraint,
+    Index,
+    text,
 )
 from datetime import datetime, timezone
+from typing import Sequence
 from app.models.base import Base, CRUDMixin, TimestampMixin
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.interfaces import LoaderOption
 
 
 class Subscription(Base, CRUDMixin):
+    __table_args__ = (
+        Index("ix_subscription_user_id_status", "user_id", "status"),
+        Index(
+            "ix_subscription_active_due_at",
+            "due_at",
+            postgresql_where=text("status = 'active'"),
+        ),
+    )
+
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     plan_id = Column(Integer, ForeignKey("plan.id"), nullable=False)
 
     start_date = Column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
     )
+    # Naive UTC, kept for the API; billing reads due_at.
     end_date = Column(DateTime, nullable=True)
+    due_at = Column(DateTime(timezone=True), nullable=True)
     status = Column(String, default="active", nullable=False)
 
-    user = relationship("User", back_populates="subscriptions")
-    plan = relationship("Plan", back_populates="subscriptions")
+    # Relationships are never loaded implicitly; callers that need them
+    # pass loader options through `load=` (e.g. selectinload).
+    user = relationship("User", back_populates="subscriptions", lazy="raise")
+    plan = relationship("Plan", back_populates="subscriptions", lazy="raise")
     invoices = relationship(
-        "Invoice", back_populates="subscription", cascade="all, delete"
+        "Invoice", back_populates="subscription", cascade="all, delete", lazy="raise"
     )
 
 
@@ -35,23 +52,46 @@ class Plan(Base, CRUDMixin, TimestampMixin):
     price = Column(Integer, nullable=False)
 
     subscriptions = relationship(
-        "Subscription", back_populates="plan", cascade="all, delete-orphan"
+        "Subscription",
+        back_populates="plan",
+        cascade="all, delete-orphan",
+        lazy="raise",
     )
 
     @classmethod
-    async def get_by_name(cls, session, name: str):
-        query = select(cls).where(cls.name == name)
+    async def get_by_name(
+        cls, session, name: str, load: Sequence[LoaderOption] | None = None
+    ):
+        query = cls._select(load).where(cls.name == name)
         result = await session.execute(query)
         return result.scalars().first()
 
 
 class Invoice(Base, CRUDMixin):
+    __table_args__ = (
+        UniqueConstraint(
+            "subscription_id", "issue_date", name="uq_invoice_subscription_issue_date"
+        ),
+        Index(
+            "ix_invoice_unpaid_subscription_id",
+            "subscription_id",
+            postgresql_where=text("status = 'unpaid'"),
+        ),
+        # Monthly partitions are managed by app.core.partitions
+        {"postgresql_partition_by": "RANGE (issue_date)"},
+    )
+
     user_id = Column(Integer, ForeignKey("user.id"), nullable=False)
     subscription_id = Column(Integer, ForeignKey("subscription.id"))
     amount = Column(Numeric)
-    issue_date = Column(Date)
+    # Partition key, hence part of the primary key
+    issue_date = Column(Date, primary_key=True)
     due_date = Column(Date)
+    # Set on payment; issue_date stays put since it picks the partition
+    paid_on = Column(Date, nullable=True)
     status = Column(String, default="unpaid")
 
-    user = relationship("User", back_populates="invoices")
-    subscription = relationship("Subscription", back_populates="invoices")
+    user = relationship("User", back_populates="invoices", lazy="raise")
+    subscription = relationship(
+        "Subscription", back_populates="invoices", lazy="raise"
+    )
@@ -1,7 +1,10 @@
-from sqlalchemy import Column, String, Integer, Boolean, select
+from typing import Sequence
+
+from sqlalchemy import Column, String, Integer, Boolean
 from app.models.base import Base, CRUDMixin, TimestampMixin
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import relationship
+from sqlalchemy.orm.interfaces import LoaderOption
 
 
 class User(Base, CRUDMixin, TimestampMixin):
@@ -12,21 +15,33 @@ class User(Base, CRUDMixin, TimestampMixin):
     password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     
-    subscriptions = relationship("Subscription", back_populates="user", cascade="all, delete-orphan", lazy="immediate")
-    invoices = relationship("Invoice", back_populates="user", cascade="all, delete-orphan")
+    # Relationships are never loaded implicitly; callers that need them
+    # pass loader options through `load=` (e.g. selectinload).
+    subscriptions = relationship("Subscription", back_populates="user", cascade="all, delete-orphan", lazy="raise")
+    invoices = relationship("Invoice", back_populates="user", cascade="all, delete-orphan", lazy="raise")
 
 
     def __repr__(self):
         return f"<User(username={self.username}, email={self.email}, is_active={self.is_active})>"
 
     @classmethod
-    async def get_by_username(cls, session: AsyncSession, username: str):
-        q = select(cls).where(cls.username == username)
+    async def get_by_username(
+        cls,
+        session: AsyncSession,
+        username: str,
+        load: Sequence[LoaderOption] | None = None,
+    ):
+        q = cls._select(load).where(cls.username == username)
         f = await session.execute(q)
         return f.scalars().first()
 
     @classmethod
-    async def get_by_email(cls, session: AsyncSession, email: str):
-        q = select(cls).where(cls.email == email)
+    async def get_by_email(
+        cls,
+        session: AsyncSession,
+        email: str,
+        load: Sequence[LoaderOption] | None = None,
+    ):
+        q = cls._select(load).where(cls.email == email)
         f = await session.execute(q)
         return f.scalars().first()
@@ -10,11 +10,14 @@ from app.schema import user
 from app.core import exceptions
 from app.core.config import settings
 from app.core.security import (
-    verify_password,
-    get_hashed_password,
+    verify_password_async,
+    get_hashed_password_async,
+    invalidate_user,
+    password_needs_rehash,
     LOGIN_VERIFICATION_AUDIENCE,
     RESET_PASSWORD_TOKEN_AUDIENCE,
 )
+from app.core.rehash import schedule_rehash
 from app.core.token import generate_jwt, decode_jwt
 from app.db import get_session
 from app.models import User
@@ -37,7 +40,9 @@ async def register_user(
     if user:
         raise exceptions.DuplicateEntry(detail="Email already exists")
 
-    user_details["password"] = get_hashed_password(user_details.get("password"))
+    user_details["password"] = await get_hashed_password_async(
+        user_details.get("password")
+    )
     _user = await User.create(session, **user_details)
     await session.commit()
     await session.refresh(_user)
@@ -52,12 +57,16 @@ async def login(
     email = form_data.username
     user: User = await User.get_by_email(session=session, email=email)
 
-    if not user or not verify_password(form_data.password, user.password):
+    if not user or not await verify_password_async(
+        form_data.password, user.password
+    ):
         raise exceptions.NotAuthorized()
 
+    if password_needs_rehash(user.password):
+        schedule_rehash(user.id, form_data.password, user.password)
+
     access_token = generate_jwt(
         data={"sub": user.username, "aud": LOGIN_VERIFICATION_AUDIENCE},
-        secret=settings.SECRET_KEY,
     )
     return {
         "access_token": access_token,
@@ -78,14 +87,13 @@ async def forgot_password(
 
     token_data = {
         "sub": str(user.id),
-        "password_fgpt": get_hashed_password(user.password),
+        "password_fgpt": await get_hashed_password_async(user.password),
         "aud": RESET_PASSWORD_TOKEN_AUDIENCE,
     }
 
     try:
         token = generate_jwt(
             token_data,
-            settings.SECRET_KEY,
             settings.USER_PWD_RESET_TOKEN_EXPIRE_MINUTES * 60,
         )
     except Exception:
@@ -102,7 +110,6 @@ async def reset_password(
     try:
         data = decode_jwt(
             reset_data.token,
-            secret=settings.SECRET_KEY,
             audience=[RESET_PASSWORD_TOKEN_AUDIENCE],
         )
     except PyJWTError:
@@ -121,7 +128,7 @@ async def reset_password(
 
     user: User = await User.get(session, user_id)
 
-    valid_password_fingerprint = verify_password(
+    valid_password_fingerprint = await verify_password_async(
         user.password, password_fingerprint
     )
 
@@ -131,7 +138,8 @@ async def reset_password(
     if not user.is_active or user.is_blocked:
         raise exceptions.InvalidUser()
 
-    hashed_password = get_hashed_password(reset_data.new_password)
+    hashed_password = await get_hashed_password_async(reset_data.new_password)
     await User.update(session, user.id, password=hashed_password)
+    await invalidate_user(user.username)
     await session.refresh(user)
     return user
@@ -1,10 +1,26 @@
-from fastapi import HTTPException, Depends, APIRouter
-from sqlalchemy import select
+from fastapi import HTTPException, Depends, APIRouter, Header, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, select
 from sqlalchemy.ext.asyncio import AsyncSession
-from datetime import datetime, timedelta, date
-
-from app.models import Plan, Subscription, User, Invoice
-from app.core.security import get_current_user
+from datetime import datetime, timedelta, timezone
+
+from app.models import Subscription, Invoice
+from app.schema.plan import (
+    InvoiceRead,
+    Message,
+    SubscriptionInvoiceRead,
+    SubscriptionRead,
+)
+from app.core.billing import billing_today
+from app.core.plan_catalog import resolve_plan_by_name
+from app.core.read_cache import (
+    get_cached,
+    invalidate_subscription_invoice,
+    set_cached,
+    subscription_invoice_key,
+)
+from app.core.renewals import cancel_renewal, schedule_renewal
+from app.core.security import CurrentUser, get_current_user
 from app.db import get_session
 from app.utils.enums import PlanEnum, PaymentStatus
 
@@ -15,61 +31,72 @@ IST = ZoneInfo("Asia/Kolkata")  # Indian Standard Time
 router = APIRouter()
 
 
-@router.get("/subscription_invoice")
+@router.get("/subscription_invoice", response_model=SubscriptionInvoiceRead)
 async def get_subscription_invoice(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
+    if_none_match: str | None = Header(None),
 ):
+    cache_key = subscription_invoice_key(current_user.id)
+    cached = await get_cached(cache_key)
+    if cached is not None:
+        if if_none_match == cached["etag"]:
+            return Response(status_code=304, headers={"ETag": cached["etag"]})
+        return ORJSONResponse(cached["payload"], headers={"ETag": cached["etag"]})
+
     try:
-        # Fetch active subscription
-        subscription_query = select(Subscription).where(
-            Subscription.user_id == current_user.id, Subscription.status == "active"
+        # Active subscription and its invoice in a single round-trip. An
+        # invoice is never issued before its subscription starts; the
+        # bound lets Postgres prune the older invoice partitions.
+        query = (
+            select(Subscription, Invoice)
+            .outerjoin(
+                Invoice,
+                (Invoice.subscription_id == Subscription.id)
+                & (Invoice.issue_date >= func.date(Subscription.start_date)),
+            )
+            .where(
+                Subscription.user_id == current_user.id,
+                Subscription.status == "active",
+            )
+            .order_by(Invoice.issue_date.desc())
+            .limit(1)
         )
-        sub_result = await session.execute(subscription_query)
-        subscription = sub_result.scalars().first()
+        row = (await session.execute(query)).first()
 
-        if not subscription:
+        if not row:
             raise HTTPException(status_code=404, detail="No active subscription found.")
 
-        # Fetch related invoice
-        invoice_query = select(Invoice).where(
-            Invoice.subscription_id == subscription.id
-        )
-        inv_result = await session.execute(invoice_query)
-        invoice = inv_result.scalars().first()
-
+        subscription, invoice = row
         if not invoice:
             raise HTTPException(
                 status_code=404, detail="No invoice found for this subscription."
             )
 
-        return {
-            "subscription": {
-                "plan_id": subscription.plan_id,
-                "start_date": subscription.start_date.isoformat(),
-                "end_date": subscription.end_date.isoformat(),
-                "status": subscription.status,
-            },
-            "invoice": {
-                "amount": float(invoice.amount),
-                "issue_date": (
-                    invoice.issue_date.isoformat() if invoice.issue_date else None
-                ),
-                "due_date": invoice.due_date.isoformat() if invoice.due_date else None,
-                "status": invoice.status,
-            },
-        }
+        payload = SubscriptionInvoiceRead(
+            subscription=SubscriptionRead.model_validate(subscription),
+            invoice=InvoiceRead.model_validate(invoice),
+        ).model_dump(mode="json")
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Failed to fetch invoice: {str(e)}"
         )
 
+    # The payload is already validated and JSON-ready; returning a response
+    # directly skips FastAPI re-validating it against the response model.
+    etag = await set_cached(cache_key, payload)
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return ORJSONResponse(payload, headers={"ETag": etag})
 
-@router.post("/subscribe")
+
+@router.post("/subscribe", response_model=Message)
 async def subscribe(
     plan: PlanEnum,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
     try:
@@ -84,22 +111,26 @@ async def subscribe(
                 "message": "You already have an active subscription. Do you want to upgrade?"
             }
 
-        selected_plan = await Plan.get_by_name(session=session, name=plan.value)
+        selected_plan = await resolve_plan_by_name(session, plan.value)
         if not selected_plan:
             raise HTTPException(status_code=404, detail="Selected plan not found")
 
         start_date = datetime.now(tz=IST)
-        end_date = start_date + timedelta(days=30)
+        due_at = start_date + timedelta(days=30)
 
-        await Subscription.create(
+        subscription = await Subscription.create(
             session=session,
             user_id=current_user.id,
             plan_id=selected_plan.id,
             start_date=start_date,
-            end_date=end_date,
+            # end_date is a naive column; store it as UTC like due_at.
+            end_date=due_at.astimezone(timezone.utc).replace(tzinfo=None),
+            due_at=due_at,
             status="active",
         )
         await session.commit()
+        await invalidate_subscription_invoice(current_user.id)
+        await schedule_renewal(subscription.id, due_at)
 
         return {"message": "Subscription successful"}
 
@@ -109,9 +140,9 @@ async def subscribe(
         )
 
 
-@router.put("/unsubscribe")
+@router.put("/unsubscribe", response_model=Message)
 async def unsubscribe(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
     try:
@@ -126,6 +157,8 @@ async def unsubscribe(
 
         existing_subscription.status = "cancelled"
         await session.commit()
+        await invalidate_subscription_invoice(current_user.id)
+        await cancel_renewal(existing_subscription.id)
 
         return {"message": "Unsubscribed successfully"}
 
@@ -133,10 +166,10 @@ async def unsubscribe(
         raise HTTPException(status_code=500, detail=f"Failed to unsubscribe: {str(e)}")
 
 
-@router.put("/payment")
+@router.put("/payment", response_model=Message)
 async def payment(
     status: PaymentStatus,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     session: AsyncSession = Depends(get_session),
 ):
     try:
@@ -150,11 +183,16 @@ async def payment(
         if not existing_subscription:
             raise HTTPException(status_code=404, detail="No active subscription found")
 
-        # Get unpaid invoice for this subscription
+        # Get unpaid invoice for this subscription, skipping the invoice
+        # partitions from before it started
         invoice_query = select(Invoice).where(
             Invoice.subscription_id == existing_subscription.id,
             Invoice.status == "unpaid",
         )
+        if existing_subscription.start_date is not None:
+            invoice_query = invoice_query.where(
+                Invoice.issue_date >= existing_subscription.start_date.date()
+            )
         invoice_result = await session.execute(invoice_query)
         invoice = invoice_result.scalars().first()
 
@@ -162,15 +200,28 @@ async def payment(
         if invoice:
             if status == PaymentStatus.SUCCESS:
                 invoice.status = "paid"
-                invoice.issue_date = date.today()
+                invoice.paid_on = billing_today()
             elif status == PaymentStatus.PENDING:
                 invoice.status = "overdue"
             else:
-                invoice.status = "upaid"
-            invoice.issue_date = date.today()
-        existing_subscription.status = "active"
+                invoice.status = "unpaid"
+
+        # Only a successful payment renews the subscription, for another
+        # period from now; otherwise it stays expired.
+        paid = status == PaymentStatus.SUCCESS
+        if paid:
+            due_at = datetime.now(tz=IST) + timedelta(days=30)
+            existing_subscription.status = "active"
+            existing_subscription.end_date = due_at.astimezone(
+                timezone.utc
+            ).replace(tzinfo=None)
+            existing_subscription.due_at = due_at
         await session.commit()
+        await invalidate_subscription_invoice(current_user.id)
+        if not paid:
+            return {"message": f"Payment {status.value}"}
 
+        await schedule_renewal(existing_subscription.id, due_at)
         return {"message": "Payment successful"}
 
     except Exception as e:
@@ -0,0 +1,34 @@
+from datetime import date, datetime
+from decimal import Decimal
+
+from pydantic import BaseModel
+
+
+class SubscriptionRead(BaseModel):
+    plan_id: int
+    start_date: datetime
+    end_date: datetime
+    status: str
+
+    class Config:
+        from_attributes = True
+
+
+class InvoiceRead(BaseModel):
+    # Serialized as a string so money never goes through a float
+    amount: Decimal | None = None
+    issue_date: date | None = None
+    due_date: date | None = None
+    status: str | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class SubscriptionInvoiceRead(BaseModel):
+    subscription: SubscriptionRead
+    invoice: InvoiceRead
+
+
+class Message(BaseModel):
+    message: str
@@ -22,4 +22,9 @@ class InvoiceStatus(Enum):
 class PaymentStatus(Enum):
     PENDING = "pending"
     SUCCESS = "success"
-    FAILED = "failed"
\ No newline at end of file
+    FAILED = "failed"
+
+class BillingRunStatus(Enum):
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
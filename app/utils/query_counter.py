@@ -0,0 +1,34 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+class QueryCounter:
+    """
+    Record every SQL statement an engine sends while the block runs:
+
+        with QueryCounter(async_engine) as queries:
+            await client.get("/api/v1/subscription_invoice")
+        assert queries.count == 2, queries.statements
+    """
+
+    def __init__(self, engine: Engine | AsyncEngine):
+        self.engine = engine.sync_engine if isinstance(engine, AsyncEngine) else engine
+        self.statements: list[str] = []
+
+    def _before_cursor_execute(
+        self, conn, cursor, statement, parameters, context, executemany
+    ):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._before_cursor_execute)
+        return False
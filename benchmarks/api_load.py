@@ -0,0 +1,139 @@
+"""
+Drive login, /subscription_invoice, /subscribe and /payment against the
+real app.main:app at a controlled concurrency on a seeded database.
+
+    python -m benchmarks.api_load --users 500 --concurrency 32 --output api.json
+"""
+
+import argparse
+import asyncio
+import re
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+
+import httpx
+
+from app.core.config import settings
+from app.core.security import get_hashed_password
+from app.main import app
+from app.db import async_engine
+from benchmarks.common import BENCH_PREFIX, cleanup, percentiles, seed, write_report
+
+PASSWORD = "BenchPassw0rd"
+STATEMENTS = re.compile(r'desc="(\d+) statements"')
+
+
+async def run(users: int, concurrency: int, polls: int) -> dict:
+    latencies: dict[str, list[float]] = defaultdict(list)
+    queries: dict[str, list[int]] = defaultdict(list)
+    statuses: dict[str, Counter] = defaultdict(Counter)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+            async def call(name, method, url, headers=None, **kwargs):
+                async with semaphore:
+                    started = time.perf_counter()
+                    response = await client.request(
+                        method, url, headers={**(headers or {}), "X-SQL-Profile": "1"}, **kwargs
+                    )
+                    latencies[name].append(time.perf_counter() - started)
+                statuses[name][response.status_code] += 1
+                match = STATEMENTS.search(response.headers.get("server-timing", ""))
+                if match:
+                    queries[name].append(int(match.group(1)))
+                return response
+
+            async def virtual_user(index: int):
+                response = await call(
+                    "login",
+                    "POST",
+                    "/api/v1/auth/login",
+                    data={
+                        "username": f"{BENCH_PREFIX}{index}@example.com",
+                        "password": PASSWORD,
+                    },
+                )
+                if response.status_code != 200:
+                    return
+                auth = {"Authorization": f"Bearer {response.json()['access_token']}"}
+                for _ in range(polls):
+                    await call(
+                        "subscription_invoice", "GET", "/api/v1/subscription_invoice", auth
+                    )
+                await call(
+                    "subscribe", "POST", "/api/v1/subscribe", auth, params={"plan": "Basic"}
+                )
+                await call(
+                    "payment", "PUT", "/api/v1/payment", auth, params={"status": "success"}
+                )
+
+            started = time.perf_counter()
+            await asyncio.gather(*(virtual_user(i) for i in range(1, users + 1)))
+            elapsed = time.perf_counter() - started
+
+    total = sum(len(samples) for samples in latencies.values())
+    return {
+        "users": users,
+        "concurrency": concurrency,
+        "requests": total,
+        "requests_per_second": round(total / elapsed, 2),
+        "endpoints": {
+            name: {
+                **percentiles(samples),
+                "statuses": dict(statuses[name]),
+                "queries_per_request": (
+                    round(sum(queries[name]) / len(queries[name]), 2)
+                    if queries[name]
+                    else None
+                ),
+            }
+            for name, samples in latencies.items()
+        },
+    }
+
+
+async def main(
+    users: int, history: int, concurrency: int, polls: int, output, keep: bool
+):
+    async with async_engine.begin() as conn:
+        await cleanup(conn)
+        await seed(
+            conn,
+            users,
+            get_hashed_password(PASSWORD),
+            history,
+            datetime.utcnow() + timedelta(days=15),
+            invoice_active=True,
+        )
+    # Statement counts come from the profiler's Server-Timing header,
+    # which is off unless the deployment opts in.
+    profiling, settings.SQL_PROFILING = settings.SQL_PROFILING, "header"
+    try:
+        results = await run(users, concurrency, polls)
+    finally:
+        settings.SQL_PROFILING = profiling
+        if not keep:
+            async with async_engine.begin() as conn:
+                await cleanup(conn)
+        await async_engine.dispose()
+    write_report("api_load", results, output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--history", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--polls", type=int, default=10)
+    parser.add_argument("--output")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+    asyncio.run(
+        main(
+            args.users, args.history, args.concurrency, args.polls, args.output, args.keep
+        )
+    )
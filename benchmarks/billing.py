@@ -0,0 +1,66 @@
+"""
+Time invoice generation for a day with N expiring subscriptions.
+
+    python -m benchmarks.billing --sizes 10000 100000 1000000 --output billing.json
+"""
+
+import argparse
+import asyncio
+import time
+from datetime import datetime, time as dt_time, timezone
+
+from app.core.billing import BILLING_TZ, billing_today, generate_invoice_range
+from app.core.config import settings
+from app.db import async_engine
+from benchmarks.common import cleanup, seed, write_report
+
+
+async def run(size: int, batch_size: int, keep: bool) -> dict:
+    today = billing_today()
+    # Midday of the billing day, as the naive UTC end_date column stores it
+    end_date = (
+        datetime.combine(today, dt_time(12), tzinfo=BILLING_TZ)
+        .astimezone(timezone.utc)
+        .replace(tzinfo=None)
+    )
+    async with async_engine.begin() as conn:
+        await cleanup(conn)
+        await seed(conn, size, "x", history=0, active_end_date=end_date)
+
+    try:
+        started = time.perf_counter()
+        invoices = await generate_invoice_range(today, batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+    finally:
+        if not keep:
+            async with async_engine.begin() as conn:
+                await cleanup(conn)
+
+    return {
+        "expiring_subscriptions": size,
+        "batch_size": batch_size,
+        "invoices": invoices,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(invoices / elapsed, 2) if elapsed else None,
+    }
+
+
+async def main(sizes: list[int], batch_size: int, keep: bool) -> list[dict]:
+    try:
+        return [await run(size, batch_size, keep) for size in sizes]
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--batch-size", type=int, default=settings.INVOICE_BATCH_SIZE)
+    parser.add_argument("--output")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded rows")
+    args = parser.parse_args()
+    write_report(
+        "billing",
+        asyncio.run(main(args.sizes, args.batch_size, args.keep)),
+        args.output,
+    )
@@ -0,0 +1,141 @@
+import json
+import statistics
+import subprocess
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from app.core.config import settings
+from app.core.partitions import create_invoice_partitions
+
+BENCH_PREFIX = "bench_"
+
+
+def percentiles(samples: list[float]) -> dict:
+    ordered = sorted(samples)
+    if not ordered:
+        return {"count": 0}
+    quantiles = statistics.quantiles(ordered, n=100) if len(ordered) > 1 else ordered * 99
+    return {
+        "count": len(ordered),
+        "p50_ms": round(quantiles[49] * 1000, 3),
+        "p95_ms": round(quantiles[94] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def write_report(name: str, results, output: str | None):
+    report = {
+        "benchmark": name,
+        "revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "results": results,
+    }
+    rendered = json.dumps(report, indent=2, default=str)
+    if output:
+        with open(output, "w") as f:
+            f.write(rendered)
+    print(rendered)
+
+
+SEED_USERS = """
+INSERT INTO "user" (first_name, last_name, username, email, password, is_active, created_on)
+SELECT 'Bench', 'User', :prefix || g, :prefix || g || '@example.com', :password, true, now()
+FROM generate_series(1, :users) AS g
+ON CONFLICT DO NOTHING
+"""
+
+SEED_HISTORY = """
+INSERT INTO subscription (user_id, plan_id, start_date, end_date, due_at, status)
+SELECT u.id, (SELECT min(id) FROM plan),
+       now() - (g * interval '30 days'), now() - ((g - 1) * interval '30 days'),
+       now() - ((g - 1) * interval '30 days'), 'expired'
+FROM "user" u, generate_series(1, :history) AS g
+WHERE u.username LIKE :prefix || '%'
+"""
+
+SEED_ACTIVE = """
+INSERT INTO subscription (user_id, plan_id, start_date, end_date, due_at, status)
+SELECT u.id, (SELECT min(id) FROM plan), :end_date - interval '30 days', :end_date,
+       :end_date AT TIME ZONE 'UTC', 'active'
+FROM "user" u
+WHERE u.username LIKE :prefix || '%'
+"""
+
+SEED_INVOICES = """
+INSERT INTO invoice (user_id, subscription_id, amount, issue_date, due_date, status)
+SELECT s.user_id, s.id, 100, s.end_date::date, s.end_date::date + 7, 'paid'
+FROM subscription s JOIN "user" u ON u.id = s.user_id
+WHERE u.username LIKE :prefix || '%' AND s.status = 'expired'
+ON CONFLICT DO NOTHING
+"""
+
+# The current period's invoice of each active subscription, for
+# scenarios that read it back (the billing benchmark must not have one).
+SEED_ACTIVE_INVOICES = """
+INSERT INTO invoice (user_id, subscription_id, amount, issue_date, due_date, status)
+SELECT s.user_id, s.id, 100, s.start_date::date, s.start_date::date + 7, 'paid'
+FROM subscription s JOIN "user" u ON u.id = s.user_id
+WHERE u.username LIKE :prefix || '%' AND s.status = 'active'
+ON CONFLICT DO NOTHING
+"""
+
+CLEANUP = [
+    """DELETE FROM invoice WHERE user_id IN
+       (SELECT id FROM "user" WHERE username LIKE :prefix || '%')""",
+    """DELETE FROM subscription WHERE user_id IN
+       (SELECT id FROM "user" WHERE username LIKE :prefix || '%')""",
+    """DELETE FROM "user" WHERE username LIKE :prefix || '%'""",
+]
+
+
+async def seed(
+    conn,
+    users: int,
+    password_hash: str,
+    history: int,
+    active_end_date: datetime,
+    invoice_active: bool = False,
+):
+    """
+    Seed `users` benchmark users, each with `history` expired monthly
+    subscriptions, one active subscription ending at `active_end_date`
+    (naive UTC) and a paid invoice for every expired subscription. The
+    active ones are only invoiced with `invoice_active`, so the billing
+    benchmark has them left to bill.
+    """
+    params = {
+        "prefix": BENCH_PREFIX,
+        "users": users,
+        "password": password_hash,
+        "history": history,
+        "end_date": active_end_date,
+    }
+    await create_invoice_partitions(
+        conn,
+        date.today(),
+        settings.INVOICE_PARTITIONS_AHEAD,
+        since=min(
+            date.today() - timedelta(days=30 * history),
+            active_end_date.date() - timedelta(days=30),
+        ),
+    )
+    statements = [SEED_USERS, SEED_HISTORY, SEED_ACTIVE, SEED_INVOICES]
+    if invoice_active:
+        statements.append(SEED_ACTIVE_INVOICES)
+    for statement in (*statements, "ANALYZE"):
+        await conn.execute(text(statement), params)
+
+
+async def cleanup(conn):
+    for statement in CLEANUP:
+        await conn.execute(text(statement), {"prefix": BENCH_PREFIX})
@@ -0,0 +1,59 @@
+"""
+Diff two benchmark reports and flag regressions beyond a tolerance.
+
+    python -m benchmarks.compare before.json after.json --tolerance 10
+"""
+
+import argparse
+import json
+import sys
+
+
+def _leaves(value, path=()):
+    if isinstance(value, dict):
+        for key, child in value.items():
+            yield from _leaves(child, path + (str(key),))
+    elif isinstance(value, list):
+        for index, child in enumerate(value):
+            yield from _leaves(child, path + (str(index),))
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield path, value
+
+
+def _direction(key: str) -> int:
+    """
+    +1 when bigger is better, -1 when smaller is better, 0 to ignore.
+    """
+    if key.endswith("per_second"):
+        return 1
+    if key.endswith(("_ms", "_us")) or key in ("seconds", "queries_per_request"):
+        return -1
+    return 0
+
+
+def compare(before: dict, after: dict, tolerance: float) -> list[str]:
+    baseline = dict(_leaves(before["results"]))
+    regressions = []
+    for path, new in _leaves(after["results"]):
+        old = baseline.get(path)
+        direction = _direction(path[-1])
+        if old is None or not direction or not old:
+            continue
+        change = (new - old) / old * 100
+        marker = ""
+        if change * direction < -tolerance:
+            marker = "  REGRESSION"
+            regressions.append(".".join(path))
+        print(f"{'.'.join(path)}: {old} -> {new} ({change:+.1f}%){marker}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--tolerance", type=float, default=10.0, help="percent")
+    args = parser.parse_args()
+    with open(args.before) as f, open(args.after) as g:
+        regressions = compare(json.load(f), json.load(g), args.tolerance)
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,50 @@
+"""
+Bearer-token verification throughput: jwt.decode with the raw secret on
+every call (the previous path) versus TokenService with prepared keys,
+with and without the verified-claims cache.
+
+    python -m benchmarks.jwt_verify --iterations 50000
+"""
+
+import argparse
+import timeit
+
+import jwt
+
+from app.core.security import LOGIN_VERIFICATION_AUDIENCE
+from app.core.token import TokenService
+from benchmarks.common import write_report
+
+SECRET = "benchmark-secret"
+AUDIENCE = [LOGIN_VERIFICATION_AUDIENCE]
+
+
+def main(iterations: int, output: str | None):
+    cached = TokenService("HS256", SECRET, "bench")
+    uncached = TokenService("HS256", SECRET, "bench", claims_cache_size=0)
+    token = cached.encode({"sub": "bench", "aud": LOGIN_VERIFICATION_AUDIENCE}, 3600)
+
+    cases = {
+        "jwt.decode": lambda: jwt.decode(
+            token, SECRET, algorithms=["HS256"], audience=AUDIENCE
+        ),
+        "service": lambda: uncached.decode(token, AUDIENCE),
+        "service+cache": lambda: cached.decode(token, AUDIENCE),
+    }
+    results = {
+        name: {
+            "verifications_per_second": round(
+                iterations / timeit.timeit(fn, number=iterations), 1
+            )
+        }
+        for name, fn in cases.items()
+    }
+    write_report("jwt_verify", results, output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50000)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    main(args.iterations, args.output)
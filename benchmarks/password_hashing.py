@@ -0,0 +1,78 @@
+"""
+Compare login latency and the latency of unrelated requests sharing the
+event loop when Argon2 runs inline versus on the hashing pool.
+
+    python -m benchmarks.password_hashing --logins 200 --concurrency 16
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from app.core.security import (
+    get_hashed_password,
+    shutdown_hash_executor,
+    verify_password,
+    verify_password_async,
+)
+from benchmarks.common import percentiles
+
+UNRELATED_REQUEST_SECONDS = 0.001
+
+
+async def _login_inline(password: str, hashed: str):
+    return verify_password(password, hashed)
+
+
+async def _run(mode: str, logins: int, concurrency: int, password: str, hashed: str):
+    login = _login_inline if mode == "inline" else verify_password_async
+    login_latencies: list[float] = []
+    unrelated_latencies: list[float] = []
+    done = asyncio.Event()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_login():
+        async with semaphore:
+            started = time.perf_counter()
+            await login(password, hashed)
+            login_latencies.append(time.perf_counter() - started)
+
+    async def unrelated_traffic():
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(UNRELATED_REQUEST_SECONDS)
+            unrelated_latencies.append(time.perf_counter() - started)
+
+    ticker = asyncio.create_task(unrelated_traffic())
+    started = time.perf_counter()
+    await asyncio.gather(*(one_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await ticker
+
+    return {
+        "mode": mode,
+        "logins_per_second": round(logins / elapsed, 2),
+        "login": percentiles(login_latencies),
+        "unrelated_request": percentiles(unrelated_latencies),
+    }
+
+
+async def main(logins: int, concurrency: int):
+    password = "BenchmarkPassw0rd"
+    hashed = get_hashed_password(password)
+    report = [
+        await _run(mode, logins, concurrency, password, hashed)
+        for mode in ("inline", "pool")
+    ]
+    shutdown_hash_executor()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.concurrency))
@@ -0,0 +1,74 @@
+"""
+Per-response serialization cost of the /subscription_invoice payload:
+the previous hand-built dict through JSONResponse/jsonable_encoder versus
+the response model rendered by ORJSONResponse.
+
+    python -m benchmarks.serialization --iterations 20000
+"""
+
+import argparse
+import timeit
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+from app.schema.plan import InvoiceRead, SubscriptionInvoiceRead, SubscriptionRead
+from benchmarks.common import write_report
+
+SUBSCRIPTION = SimpleNamespace(
+    plan_id=1,
+    start_date=datetime(2026, 9, 18, 10, 30, tzinfo=timezone.utc),
+    end_date=datetime(2026, 10, 18, 10, 30),
+    status="active",
+)
+INVOICE = SimpleNamespace(
+    amount=Decimal("199.00"),
+    issue_date=date(2026, 10, 18),
+    due_date=date(2026, 10, 25),
+    status="unpaid",
+)
+
+
+def before() -> bytes:
+    payload = {
+        "subscription": {
+            "plan_id": SUBSCRIPTION.plan_id,
+            "start_date": SUBSCRIPTION.start_date.isoformat(),
+            "end_date": SUBSCRIPTION.end_date.isoformat(),
+            "status": SUBSCRIPTION.status,
+        },
+        "invoice": {
+            "amount": float(INVOICE.amount),
+            "issue_date": INVOICE.issue_date.isoformat(),
+            "due_date": INVOICE.due_date.isoformat(),
+            "status": INVOICE.status,
+        },
+    }
+    return JSONResponse(jsonable_encoder(payload)).body
+
+
+def after() -> bytes:
+    payload = SubscriptionInvoiceRead(
+        subscription=SubscriptionRead.model_validate(SUBSCRIPTION),
+        invoice=InvoiceRead.model_validate(INVOICE),
+    ).model_dump(mode="json")
+    return ORJSONResponse(payload).body
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+    results = {
+        name: {
+            "per_response_us": round(
+                timeit.timeit(fn, number=args.iterations) / args.iterations * 1e6, 3
+            )
+        }
+        for name, fn in (("before", before), ("after", after))
+    }
+    write_report("serialization", results, args.output)
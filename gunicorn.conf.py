@@ -0,0 +1,39 @@
+# Production server: `gunicorn -c gunicorn.conf.py app.main:app`
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+
+# Async workers are CPU bound on serialization/hashing rather than
+# blocked on I/O, so one worker per core is the right starting point.
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+
+# UvicornWorker picks uvloop and httptools automatically when installed.
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# On SIGTERM stop accepting, let in-flight requests finish for up to
+# graceful_timeout, then run the lifespan shutdown of each worker.
+graceful_timeout = int(os.getenv("GRACEFUL_TIMEOUT", 30))
+timeout = int(os.getenv("WORKER_TIMEOUT", 60))
+keepalive = int(os.getenv("KEEPALIVE", 5))
+
+# Recycle workers periodically to bound memory growth.
+max_requests = int(os.getenv("MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("MAX_REQUESTS_JITTER", 1000))
+
+accesslog = None
+
+
+def on_starting(server):
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for name in os.listdir(multiproc_dir):
+            os.remove(os.path.join(multiproc_dir, name))
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,188 @@
+"""
+Fixtures for the API tests. They run against the database and Redis
+configured in the environment, migrated to head and seeded with
+`python -m app.initial_data`, and clean up the rows they create:
+
+    pip install -r requirements.txt -r tests/requirements.txt
+    pytest
+"""
+
+import uuid
+from datetime import date, datetime, timedelta, timezone
+
+import fakeredis
+import pytest
+from httpx import ASGITransport, AsyncClient
+from redis.exceptions import RedisError
+from sqlalchemy import delete, select, text
+
+from app.core.config import settings
+from app.core.partitions import create_invoice_partitions
+from app.core.plan_catalog import load_plan_catalog, plan_catalog
+from app.core.redis_client import get_async_redis
+from app.core.renewals import cancel_renewal
+from app.core.security import (
+    LOGIN_VERIFICATION_AUDIENCE,
+    get_current_user,
+    get_hashed_password,
+)
+from app.core.token import generate_jwt
+from app.db import async_engine, async_session
+from app.main import app
+from app.models import Invoice, Subscription, User
+from app.utils.enums import InvoiceStatus, SubscriptionStatus
+
+TEST_PREFIX = "test_"
+TEST_PASSWORD = "Secret-passw0rd"
+
+
+@pytest.fixture(scope="session")
+async def services():
+    """
+    Skip the tests that need them without Postgres or Redis, and do the
+    work the app's lifespan would: connect (so dialect setup is not counted), load the
+    plan catalog and make sure the current invoice partition exists.
+    """
+    try:
+        async with async_engine.begin() as conn:
+            await conn.execute(text("SELECT 1"))
+            await create_invoice_partitions(
+                conn, date.today(), settings.INVOICE_PARTITIONS_AHEAD
+            )
+    except Exception as e:
+        pytest.skip(f"Database unavailable: {e}")
+    try:
+        await get_async_redis().ping()
+    except RedisError as e:
+        pytest.skip(f"Redis unavailable: {e}")
+
+    async with async_session() as session:
+        await load_plan_catalog(session)
+    if not len(plan_catalog):
+        pytest.skip("No plans; run python -m app.initial_data")
+
+    yield
+    await get_async_redis().aclose()
+    await async_engine.dispose()
+
+
+@pytest.fixture
+def fake_redis():
+    return fakeredis.FakeRedis()
+
+
+@pytest.fixture
+async def fake_async_redis():
+    client = fakeredis.aioredis.FakeRedis()
+    yield client
+    await client.aclose()
+
+
+@pytest.fixture
+async def client(services):
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        yield client
+
+
+@pytest.fixture
+async def user(services):
+    name = f"{TEST_PREFIX}{uuid.uuid4().hex[:12]}"
+    async with async_session() as session:
+        user = await User.create(
+            session,
+            first_name="Test",
+            last_name="User",
+            username=name,
+            email=f"{name}@example.com",
+            password=get_hashed_password(TEST_PASSWORD),
+        )
+        await session.commit()
+
+    yield user
+
+    async with async_session() as session:
+        subscription_ids = (
+            await session.execute(
+                select(Subscription.id).where(Subscription.user_id == user.id)
+            )
+        ).scalars().all()
+        await session.execute(delete(Invoice).where(Invoice.user_id == user.id))
+        await session.execute(
+            delete(Subscription).where(Subscription.user_id == user.id)
+        )
+        await session.execute(delete(User).where(User.id == user.id))
+        await session.commit()
+    for subscription_id in subscription_ids:
+        await cancel_renewal(subscription_id)
+
+
+@pytest.fixture
+def login_form(user):
+    return {"username": user.email, "password": TEST_PASSWORD}
+
+
+@pytest.fixture
+async def auth_headers(user):
+    """
+    Bearer headers for `user`, with the principal already cached so the
+    statement counts cover the route alone.
+    """
+    token = generate_jwt(
+        data={"sub": user.username, "aud": LOGIN_VERIFICATION_AUDIENCE}
+    )
+    await get_current_user(token)
+    return {"Authorization": f"Bearer {token}"}
+
+
+async def _create_subscription(user: User, status: SubscriptionStatus):
+    start_date = datetime.now(timezone.utc) - timedelta(days=1)
+    due_at = start_date + timedelta(days=30)
+    async with async_session() as session:
+        subscription = await Subscription.create(
+            session,
+            user_id=user.id,
+            plan_id=plan_catalog.all()[0].id,
+            start_date=start_date,
+            end_date=due_at.replace(tzinfo=None),
+            due_at=due_at,
+            status=status.value,
+        )
+        await session.commit()
+    return subscription
+
+
+async def _create_invoice(subscription: Subscription, status: InvoiceStatus):
+    async with async_session() as session:
+        invoice = await Invoice.create(
+            session,
+            user_id=subscription.user_id,
+            subscription_id=subscription.id,
+            amount=plan_catalog.get(subscription.plan_id).price,
+            issue_date=date.today(),
+            due_date=date.today() + timedelta(days=7),
+            status=status.value,
+        )
+        await session.commit()
+    return invoice
+
+
+@pytest.fixture
+async def active_subscription(user):
+    return await _create_subscription(user, SubscriptionStatus.ACTIVE)
+
+
+@pytest.fixture
+async def expired_subscription(user):
+    return await _create_subscription(user, SubscriptionStatus.EXPIRED)
+
+
+@pytest.fixture
+async def paid_invoice(active_subscription):
+    return await _create_invoice(active_subscription, InvoiceStatus.paid)
+
+
+@pytest.fixture
+async def unpaid_invoice(expired_subscription):
+    return await _create_invoice(expired_subscription, InvoiceStatus.unpaid)
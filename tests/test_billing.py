@@ -0,0 +1,163 @@
+"""
+Invoice generation against Postgres: the single-statement billing batch
+and what it leaves behind.
+"""
+
+import asyncio
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import delete, func, select, update
+
+from app.core.billing import (
+    bill_subscriptions,
+    billing_day_bounds,
+    billing_today,
+    finish_billing_run,
+    generate_invoices,
+    start_billing_run,
+)
+from app.core.plan_catalog import plan_catalog
+from app.db import async_engine, async_session
+from app.models import BillingRun, Invoice, Plan, Subscription
+from app.utils.enums import BillingRunStatus, InvoiceStatus, SubscriptionStatus
+from app.utils.query_counter import QueryCounter
+
+DUE_TODAY = 50
+
+
+@pytest.fixture
+async def due_today(user):
+    """
+    `DUE_TODAY` active subscriptions of `user` falling due today.
+    """
+    start, _ = billing_day_bounds(billing_today())
+    due_at = start + timedelta(hours=1)
+    plan_id = plan_catalog.all()[0].id
+    async with async_session() as session:
+        subscriptions = await Subscription.bulk_create(
+            session,
+            [
+                {
+                    "user_id": user.id,
+                    "plan_id": plan_id,
+                    "start_date": due_at - timedelta(days=30),
+                    "end_date": due_at.replace(tzinfo=None),
+                    "due_at": due_at,
+                    "status": SubscriptionStatus.ACTIVE.value,
+                }
+                for _ in range(DUE_TODAY)
+            ],
+        )
+        await session.commit()
+    return [subscription.id for subscription in subscriptions]
+
+
+async def test_bill_subscriptions(active_subscription):
+    today = billing_today()
+    async with async_session() as session:
+        with QueryCounter(async_engine) as queries:
+            invoiced = await bill_subscriptions(session, [active_subscription.id], today)
+    assert invoiced == 1
+    # Claim, expire and invoice in one statement
+    assert queries.count == 1, queries.statements
+
+    async with async_session() as session:
+        subscription = await session.get(Subscription, active_subscription.id)
+        invoices = (
+            await session.execute(
+                select(Invoice).where(Invoice.subscription_id == subscription.id)
+            )
+        ).scalars().all()
+    assert subscription.status == SubscriptionStatus.EXPIRED.value
+    assert len(invoices) == 1
+    assert invoices[0].issue_date == today
+    assert invoices[0].status == InvoiceStatus.unpaid.value
+    assert invoices[0].amount == plan_catalog.get(subscription.plan_id).price
+
+
+async def test_bill_subscriptions_skips_inactive(expired_subscription):
+    async with async_session() as session:
+        invoiced = await bill_subscriptions(
+            session, [expired_subscription.id], billing_today()
+        )
+    assert invoiced == 0
+
+
+async def test_bill_subscriptions_uses_current_price(active_subscription):
+    plan_id = active_subscription.plan_id
+    price = plan_catalog.get(plan_id).price
+    async with async_session() as session:
+        await session.execute(
+            update(Plan).where(Plan.id == plan_id).values(price=price + 1)
+        )
+        await session.commit()
+    try:
+        async with async_session() as session:
+            await bill_subscriptions(session, [active_subscription.id], billing_today())
+            amount = (
+                await session.execute(
+                    select(Invoice.amount).where(
+                        Invoice.subscription_id == active_subscription.id
+                    )
+                )
+            ).scalar_one()
+    finally:
+        async with async_session() as session:
+            await session.execute(
+                update(Plan).where(Plan.id == plan_id).values(price=price)
+            )
+            await session.commit()
+    assert amount == price + 1
+
+
+async def test_overlapping_runs_bill_each_subscription_once(due_today):
+    today = billing_today()
+
+    async def run():
+        async with async_session() as session:
+            return await generate_invoices(
+                session,
+                today,
+                batch_size=7,
+                start_id=min(due_today),
+                end_id=max(due_today),
+            )
+
+    # SKIP LOCKED splits the rows between the runs; the unique
+    # (subscription_id, issue_date) constraint backs it up.
+    first, second = await asyncio.gather(run(), run())
+    assert first + second == DUE_TODAY
+
+    async with async_session() as session:
+        invoiced = (
+            await session.execute(
+                select(Invoice.subscription_id, func.count())
+                .where(Invoice.subscription_id.in_(due_today))
+                .group_by(Invoice.subscription_id)
+            )
+        ).all()
+    assert len(invoiced) == DUE_TODAY
+    assert all(count == 1 for _, count in invoiced)
+
+    # A rerun finds nothing left to bill
+    assert await run() == 0
+
+
+async def test_billing_run_ledger(due_today):
+    run_id, shards = await start_billing_run(
+        billing_today(), shard_size=DUE_TODAY, max_shards=4
+    )
+    try:
+        assert shards
+        await finish_billing_run(run_id, BillingRunStatus.COMPLETED, invoices=3)
+        async with async_session() as session:
+            run = await session.get(BillingRun, run_id)
+        assert run.status == BillingRunStatus.COMPLETED.value
+        assert run.shards == len(shards)
+        assert run.invoices == 3
+        assert run.finished_on >= run.started_on
+    finally:
+        async with async_session() as session:
+            await session.execute(delete(BillingRun).where(BillingRun.id == run_id))
+            await session.commit()
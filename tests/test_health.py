@@ -0,0 +1,11 @@
+"""
+The operational endpoints.
+"""
+
+
+async def test_health_reports_the_pool(client):
+    response = await client.get("/health")
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert "pool" in body["db_pool"]
@@ -0,0 +1,30 @@
+"""
+The Redis billing-run lock, on fakeredis.
+"""
+
+from app.core.lock import acquire_lock, release_lock
+
+
+def test_acquire_lock_is_exclusive(fake_redis):
+    assert acquire_lock(fake_redis, "billing-run:test", "first", timeout=60)
+    assert not acquire_lock(fake_redis, "billing-run:test", "second", timeout=60)
+    assert 0 < fake_redis.ttl("billing-run:test") <= 60
+
+
+def test_release_lock_frees_it(fake_redis):
+    acquire_lock(fake_redis, "billing-run:test", "first", timeout=60)
+
+    assert release_lock(fake_redis, "billing-run:test", "first")
+    assert acquire_lock(fake_redis, "billing-run:test", "second", timeout=60)
+
+
+def test_release_lock_ignores_other_tokens(fake_redis):
+    # A run whose lock expired must not release its successor's lock
+    acquire_lock(fake_redis, "billing-run:test", "second", timeout=60)
+
+    assert not release_lock(fake_redis, "billing-run:test", "first")
+    assert fake_redis.get("billing-run:test") == b"second"
+
+
+def test_release_lock_without_lock(fake_redis):
+    assert not release_lock(fake_redis, "billing-run:test", "first")
@@ -0,0 +1,164 @@
+"""
+Model conventions and the CRUDMixin helpers.
+"""
+
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.plan_catalog import plan_catalog
+from app.db import async_session
+from app.models import Base, Invoice, Subscription
+from app.models.base import decode_cursor, encode_cursor
+from app.utils.enums import InvoiceStatus, SubscriptionStatus
+
+
+def test_relationships_never_load_implicitly():
+    lazy = {
+        f"{mapper.class_.__name__}.{relationship.key}": relationship.lazy
+        for mapper in Base.registry.mappers
+        for relationship in mapper.relationships
+    }
+    assert lazy and all(strategy == "raise" for strategy in lazy.values()), lazy
+
+
+@pytest.fixture
+async def subscriptions(user):
+    plan_id = plan_catalog.all()[0].id
+    async with async_session() as session:
+        subscriptions = await Subscription.bulk_create(
+            session,
+            [
+                {
+                    "user_id": user.id,
+                    "plan_id": plan_id,
+                    "status": SubscriptionStatus.CANCELLED.value,
+                }
+                for _ in range(5)
+            ],
+            chunk_size=2,
+        )
+        await session.commit()
+    return subscriptions
+
+
+def _mine(subscriptions):
+    return [Subscription.id.in_([subscription.id for subscription in subscriptions])]
+
+
+async def test_bulk_create(subscriptions):
+    assert len({subscription.id for subscription in subscriptions}) == 5
+    async with async_session() as session:
+        stored = await session.scalars(
+            select(Subscription).where(*_mine(subscriptions))
+        )
+        assert len(stored.all()) == 5
+
+
+async def test_bulk_update_counts_updated_rows(subscriptions):
+    first, second, *_ = subscriptions
+    async with async_session() as session:
+        updated = await Subscription.bulk_update(
+            session,
+            {
+                first.id: {"status": SubscriptionStatus.EXPIRED.value},
+                second.id: {
+                    "status": SubscriptionStatus.ACTIVE.value,
+                    "plan_id": second.plan_id,
+                },
+                -1: {"status": SubscriptionStatus.EXPIRED.value},
+            },
+        )
+    assert updated == 2
+
+    async with async_session() as session:
+        statuses = dict(
+            (
+                await session.execute(
+                    select(Subscription.id, Subscription.status).where(
+                        *_mine(subscriptions)
+                    )
+                )
+            ).all()
+        )
+    assert statuses[first.id] == SubscriptionStatus.EXPIRED.value
+    assert statuses[second.id] == SubscriptionStatus.ACTIVE.value
+
+
+async def test_bulk_update_composite_key(paid_invoice):
+    async with async_session() as session:
+        updated = await Invoice.bulk_update(
+            session,
+            {
+                (paid_invoice.id, paid_invoice.issue_date): {
+                    "status": InvoiceStatus.overdue.value
+                },
+                # Right id, wrong partition
+                (paid_invoice.id, paid_invoice.issue_date - timedelta(days=1)): {
+                    "status": InvoiceStatus.unpaid.value
+                },
+            },
+        )
+    assert updated == 1
+
+    async with async_session() as session:
+        status = (
+            await session.execute(
+                select(Invoice.status).where(Invoice.id == paid_invoice.id)
+            )
+        ).scalar_one()
+    assert status == InvoiceStatus.overdue.value
+
+
+async def test_bulk_update_rejects_partial_composite_key(paid_invoice):
+    async with async_session() as session:
+        with pytest.raises(Exception, match=r"keyed by \(id, issue_date\)"):
+            await Invoice.bulk_update(session, {paid_invoice.id: {"status": "paid"}})
+
+
+async def test_bulk_delete(subscriptions):
+    ids = sorted(subscription.id for subscription in subscriptions)
+    deleted_ids, kept_ids = ids[:3], ids[3:]
+    async with async_session() as session:
+        deleted = await Subscription.bulk_delete(
+            session, [*deleted_ids, -1], chunk_size=2
+        )
+    assert sorted(deleted) == deleted_ids
+
+    async with async_session() as session:
+        remaining = (
+            await session.scalars(select(Subscription.id).where(*_mine(subscriptions)))
+        ).all()
+    assert sorted(remaining) == kept_ids
+
+
+async def test_get_page_round_trips_the_cursor(subscriptions):
+    pages, cursor = [], None
+    async with async_session() as session:
+        while True:
+            items, cursor = await Subscription.get_page(
+                session, limit=2, cursor=cursor, where=_mine(subscriptions)
+            )
+            pages.append([item.id for item in items])
+            if cursor is None:
+                break
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert sum(pages, []) == sorted(subscription.id for subscription in subscriptions)
+
+
+def test_decode_cursor_rejects_garbage():
+    assert decode_cursor(encode_cursor(42)) == 42
+    with pytest.raises(Exception, match="Invalid cursor"):
+        decode_cursor("not-a-cursor")
+
+
+async def test_stream(subscriptions):
+    async with async_session() as session:
+        streamed = [
+            item.id
+            async for item in Subscription.stream(
+                session, batch_size=2, where=_mine(subscriptions)
+            )
+        ]
+    assert streamed == sorted(subscription.id for subscription in subscriptions)
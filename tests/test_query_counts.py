@@ -0,0 +1,108 @@
+"""
+Pin the number of SQL statements each hot endpoint sends, so an N+1 or
+an implicit relationship load (every relationship is lazy="raise") shows
+up as a failing count rather than as latency in production.
+"""
+
+from sqlalchemy import select
+
+from app.core.billing import billing_today
+from app.core.read_cache import invalidate_subscription_invoice
+from app.db import async_engine, async_session
+from app.models import Invoice, Subscription
+from app.utils.enums import PlanEnum
+from app.utils.query_counter import QueryCounter
+
+
+async def test_login(client, login_form):
+    with QueryCounter(async_engine) as queries:
+        response = await client.post("/api/v1/auth/login", data=login_form)
+    assert response.status_code == 200, response.text
+    # The user by email
+    assert queries.count == 1, queries.statements
+
+
+async def test_subscription_invoice(client, user, auth_headers, paid_invoice):
+    await invalidate_subscription_invoice(user.id)
+    with QueryCounter(async_engine) as queries:
+        response = await client.get(
+            "/api/v1/subscription_invoice", headers=auth_headers
+        )
+    assert response.status_code == 200, response.text
+    # Subscription and invoice in one joined query
+    assert queries.count == 1, queries.statements
+
+    # Served from the read cache until something changes
+    with QueryCounter(async_engine) as queries:
+        response = await client.get(
+            "/api/v1/subscription_invoice", headers=auth_headers
+        )
+    assert response.status_code == 200, response.text
+    assert queries.count == 0, queries.statements
+
+
+async def test_subscribe(client, auth_headers):
+    with QueryCounter(async_engine) as queries:
+        response = await client.post(
+            "/api/v1/subscribe",
+            params={"plan": PlanEnum.BASIC.value},
+            headers=auth_headers,
+        )
+    assert response.status_code == 200, response.text
+    assert response.json() == {"message": "Subscription successful"}
+    # Active subscription check and the insert; the plan comes from the
+    # catalog and the renewal is queued in Redis
+    assert queries.count == 2, queries.statements
+
+
+async def test_unsubscribe(client, auth_headers, active_subscription):
+    with QueryCounter(async_engine) as queries:
+        response = await client.put("/api/v1/unsubscribe", headers=auth_headers)
+    assert response.status_code == 200, response.text
+    # The active subscription and its update
+    assert queries.count == 2, queries.statements
+
+
+async def test_payment(client, auth_headers, expired_subscription, unpaid_invoice):
+    with QueryCounter(async_engine) as queries:
+        response = await client.put(
+            "/api/v1/payment", params={"status": "success"}, headers=auth_headers
+        )
+    assert response.status_code == 200, response.text
+    # The expired subscription, its unpaid invoice and one update of each
+    assert queries.count == 4, queries.statements
+
+    async with async_session() as session:
+        subscription = await session.get(Subscription, expired_subscription.id)
+        invoice = (
+            await session.execute(
+                select(Invoice).where(Invoice.id == unpaid_invoice.id)
+            )
+        ).scalar_one()
+    assert subscription.status == "active"
+    assert subscription.due_at > expired_subscription.due_at
+    assert invoice.status == "paid"
+    assert invoice.paid_on == billing_today()
+    assert invoice.issue_date == unpaid_invoice.issue_date
+
+
+async def test_failed_payment(client, auth_headers, expired_subscription, unpaid_invoice):
+    with QueryCounter(async_engine) as queries:
+        response = await client.put(
+            "/api/v1/payment", params={"status": "failed"}, headers=auth_headers
+        )
+    assert response.status_code == 200, response.text
+    assert response.json() == {"message": "Payment failed"}
+    # The expired subscription and its unpaid invoice; nothing changes
+    assert queries.count == 2, queries.statements
+
+    async with async_session() as session:
+        subscription = await session.get(Subscription, expired_subscription.id)
+        invoice = (
+            await session.execute(
+                select(Invoice).where(Invoice.id == unpaid_invoice.id)
+            )
+        ).scalar_one()
+    assert subscription.status == "expired"
+    assert subscription.due_at == expired_subscription.due_at
+    assert invoice.status == "unpaid"
@@ -0,0 +1,59 @@
+"""
+Principal cache invalidation across the in-process and Redis tiers.
+"""
+
+import json
+from dataclasses import asdict
+
+import pytest
+
+from app.core import security
+from app.core.config import settings
+from app.core.events import ChangeEvent
+from app.core.security import CurrentUser, on_user_change
+from app.db import async_session
+from app.models import User
+
+PRINCIPAL = CurrentUser(
+    id=42, username="test_principal", email="principal@example.com", is_active=True
+)
+
+
+@pytest.fixture
+def redis_tier(monkeypatch, fake_async_redis):
+    monkeypatch.setattr(settings, "AUTH_CACHE_REDIS", True)
+    monkeypatch.setattr(security, "get_async_redis", lambda: fake_async_redis)
+    return fake_async_redis
+
+
+async def test_on_user_change_drops_both_tiers(redis_tier):
+    key = security._principal_cache_key(PRINCIPAL.username)
+    security._cache_principal(PRINCIPAL)
+    await redis_tier.set(key, json.dumps(asdict(PRINCIPAL)))
+
+    await on_user_change([ChangeEvent(table="user", op="update", id=PRINCIPAL.id)])
+
+    assert security._principal_cache.get(PRINCIPAL.username) is None
+    assert await redis_tier.get(key) is None
+
+
+async def test_on_user_change_ignores_unknown_users(redis_tier):
+    other = security._principal_cache_key("test_other")
+    await redis_tier.set(other, "{}")
+
+    await on_user_change([ChangeEvent(table="user", op="delete", id=-1)])
+
+    assert await redis_tier.get(other) is not None
+
+
+async def test_deactivated_user_is_not_served_from_redis(redis_tier, user):
+    principal = await security._load_principal(user.username)
+    assert principal.is_active
+
+    async with async_session() as session:
+        await User.update(session, user.id, is_active=False)
+    # What the event bus delivers for the UPDATE above
+    await on_user_change([ChangeEvent(table="user", op="update", id=user.id)])
+
+    principal = await security._load_principal(user.username)
+    assert not principal.is_active